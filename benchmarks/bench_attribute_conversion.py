@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Per-value versus column-oriented (batch) attribute conversion.
+
+Converts columns of Int, Float, Bool and UUID attribute values and exports
+the attributes of a collection of Compute resource instances.
+
+Usage: bench_attribute_conversion.py [-n COUNT]
+"""
+
+import optparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.core import (IntAttribute, FloatAttribute, BoolAttribute,
+        UUIDAttribute, Resource, export_attributes_many)
+from occi.ext.infrastructure import *
+
+def bench(label, func, number=3):
+    t = min(timeit.repeat(func, number=1, repeat=number))
+    print '  %-32s %10.2f ms' % (label, t * 1e3)
+    return t
+
+def compare(label, attribute, values):
+    print label
+    single = lambda: [attribute.to_native(v) for v in values]
+    assert single() == attribute.to_native_many(values)
+    t0 = bench('per-value', single)
+    t1 = bench('batch', lambda: attribute.to_native_many(values))
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Attribute conversion benchmark')
+    parser.add_option('-n', dest='count', type='int', default=100000,
+            help='Number of values per column (default 100000)')
+    (options, args) = parser.parse_args()
+    n = options.count
+
+    print '%d values per column' % n
+    compare('int', IntAttribute('a'), [str(i) for i in xrange(n)])
+    compare('float', FloatAttribute('a'), ['%d.25' % i for i in xrange(n)])
+    compare('bool', BoolAttribute('a'), ['true', 'false'] * (n // 2))
+    compare('uuid', UUIDAttribute('a'), [str(uuid.uuid4()) for i in xrange(n // 10)])
+
+    computes = []
+    for i in xrange(n // 10):
+        compute = Resource(ComputeKind)
+        compute.occi_import_attributes([
+            ('occi.core.id', str(uuid.uuid4())),
+            ('occi.compute.cores', str(i % 16)),
+            ('occi.compute.speed', '2.67'),
+            ('occi.compute.memory', '%d.0' % (i % 64)),
+            ('occi.compute.state', 'active')], validate=False)
+        computes.append(compute)
+    print 'export %d Compute resource instances' % len(computes)
+    single = lambda: [c.occi_export_attributes() for c in computes]
+    assert single() == export_attributes_many(computes)
+    t0 = bench('per-entity', single)
+    t1 = bench('batch', lambda: export_attributes_many(computes))
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Parsing of Category headers naming registered Kinds and Mixins.
+
+Compares HeaderParser creating new Category instances for every request with
+the cache of resolved registry categories keyed by registry generation.
+
+Usage: bench_category_header.py [-n REQUESTS]
+"""
+
+import optparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.core import CategoryRegistry
+from occi.ext.infrastructure import *
+from occi.http.parser import HeaderParser
+
+HEADERS = [
+    ('Category', 'compute; scheme="http://schemas.ogf.org/occi/infrastructure#"; class="kind"'),
+    ('Category', 'ipnetworkinterface; scheme="http://schemas.ogf.org/occi/infrastructure#"; class="mixin"'),
+    ('X-OCCI-Attribute', 'occi.compute.cores=2, occi.compute.memory=4.0'),
+]
+
+def bench(label, func, number=3):
+    t = min(timeit.repeat(func, number=1, repeat=number))
+    print '  %-32s %10.2f ms' % (label, t * 1e3)
+    return t
+
+def parse(count, registry, cached):
+    for i in xrange(count):
+        p = HeaderParser(category_registry=cached and registry or None)
+        p.parse(headers=HEADERS)
+        p.objects[0]._resolve_categories(p.objects[0].categories, registry)
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Category header benchmark')
+    parser.add_option('-n', dest='count', type='int', default=20000,
+            help='Number of requests (default 20000)')
+    (options, args) = parser.parse_args()
+
+    registry = CategoryRegistry()
+    registry.register(ComputeKind)
+    registry.register(IPNetworkInterfaceMixin)
+
+    print '%d requests' % options.count
+    t0 = bench('new instances', lambda: parse(options.count, registry, False))
+    t1 = bench('resolved cache', lambda: parse(options.count, registry, True))
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Binary codec versus the JSON renderer.
+
+Encodes and decodes a collection of Compute resource instances using
+occi.codec and using the application/occi+json rendering (DataObject plus
+JSONRenderer, parsed back with json.loads and occi_import_attributes).
+
+Usage: bench_codec.py [-n COUNT]
+"""
+
+import json
+import optparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.core import CategoryRegistry, Resource
+from occi.codec import encode_entities, decode_entities
+from occi.http.content_json import JSONRenderer
+from occi.http.dataobject import DataObject, URLTranslator
+from occi.ext.infrastructure import *
+
+def bench(label, func, number=3):
+    t = min(timeit.repeat(func, number=1, repeat=number))
+    print '  %-32s %10.2f ms' % (label, t * 1e3)
+    return t
+
+def json_encode(entities, translator):
+    objects = []
+    for entity in entities:
+        obj = DataObject(translator=translator)
+        obj.load_from_entity(entity)
+        objects.append(obj)
+    renderer = JSONRenderer()
+    renderer.render(objects)
+    return renderer.body
+
+def json_decode(body):
+    entities = []
+    for obj in json.loads(body)['collection']:
+        entity = Resource(ComputeKind)
+        entity.occi_import_attributes(obj['attributes'].items(), validate=False)
+        entities.append(entity)
+    return entities
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Binary codec benchmark')
+    parser.add_option('-n', dest='count', type='int', default=10000,
+            help='Number of Compute resource instances (default 10000)')
+    (options, args) = parser.parse_args()
+
+    registry = CategoryRegistry()
+    registry.register(ComputeKind)
+    JSONRenderer.INDENT = None
+    translator = URLTranslator('http://example.com/api/')
+
+    computes = []
+    for i in xrange(options.count):
+        compute = Resource(ComputeKind)
+        compute.occi_import_attributes([
+            ('occi.core.id', str(uuid.uuid4())),
+            ('occi.core.title', 'vm%d' % i),
+            ('occi.compute.cores', str(i % 16)),
+            ('occi.compute.speed', '2.67'),
+            ('occi.compute.memory', '%d.0' % (i % 64)),
+            ('occi.compute.state', 'active')], validate=False)
+        compute.occi_set_applicable_action(ComputeStopActionCategory)
+        computes.append(compute)
+
+    body = json_encode(computes, translator)
+    data = encode_entities(computes)
+    decoded = decode_entities(data, registry)
+    assert [c.occi_get_fingerprint() for c in decoded] == \
+            [c.occi_get_fingerprint() for c in computes]
+
+    print '%d Compute resource instances' % len(computes)
+    print '  %-32s %10d bytes' % ('json size', len(body))
+    print '  %-32s %10d bytes' % ('codec size', len(data))
+    print 'encode'
+    t0 = bench('json', lambda: json_encode(computes, translator))
+    t1 = bench('codec', lambda: encode_entities(computes))
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
+    print 'decode'
+    t0 = bench('json', lambda: json_decode(body))
+    t1 = bench('codec', lambda: decode_entities(data, registry))
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Memory footprint of ComputeKind resource instances.
+
+Compares the slotted `Entity` layout with the previous layout where each
+instance carried its own attribute, mixin and action dictionaries. Each layout
+is measured in a separate process.
+
+Usage: bench_entity_memory.py [-n COUNT]
+"""
+
+import optparse
+import os
+import subprocess
+import sys
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.core import EntityTranslator, Resource
+from occi.ext.infrastructure import ComputeKind, ComputeStartActionCategory
+
+class DictEntity(object):
+    """Replica of the previous per-instance dictionary layout."""
+    def __init__(self, kind):
+        self._occi_kind = kind
+        self._occi_mixins = {}
+        self._occi_attributes = {}
+        self._occi_actions_available = {}
+        self._occi_actions_applicable = {}
+        self._occi_translator = EntityTranslator()
+        for action in kind.actions:
+            self._occi_actions_available[str(action)] = action
+        self.links = []
+
+    def occi_set_attribute(self, name, value):
+        self._occi_attributes[name] = value
+
+    def occi_set_applicable_action(self, action):
+        self._occi_actions_applicable[str(action)] = True
+
+def rss_kb():
+    """Resident set size of the current process in kB (Linux only)."""
+    for line in open('/proc/self/status'):
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1])
+    return 0
+
+def populate(layout, count):
+    if layout == 'dict':
+        factory = lambda: DictEntity(ComputeKind)
+    else:
+        factory = lambda: Resource(ComputeKind)
+    ids = [uuid.uuid4() for i in xrange(count)]
+    titles = ['vm%d' % i for i in xrange(count)]
+
+    before = rss_kb()
+    entities = []
+    for i in xrange(count):
+        e = factory()
+        e.occi_set_attribute('occi.core.id', ids[i])
+        e.occi_set_attribute('occi.core.title', titles[i])
+        e.occi_set_attribute('occi.compute.cores', 2)
+        e.occi_set_attribute('occi.compute.memory', 4.0)
+        e.occi_set_attribute('occi.compute.state', 'active')
+        e.occi_set_applicable_action(ComputeStartActionCategory)
+        entities.append(e)
+    after = rss_kb()
+    return after - before
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Entity memory benchmark')
+    parser.add_option('-n', dest='count', type='int', default=1000000,
+            help='Number of ComputeKind instances (default 1000000)')
+    parser.add_option('--layout', dest='layout', default=None,
+            help=optparse.SUPPRESS_HELP)
+    (options, args) = parser.parse_args()
+
+    if options.layout:
+        print populate(options.layout, options.count)
+        sys.exit(0)
+
+    result = {}
+    for layout in ('dict', 'slots'):
+        out = subprocess.check_output([sys.executable, __file__,
+            '-n', str(options.count), '--layout', layout])
+        result[layout] = int(out.strip())
+
+    print '%d ComputeKind instances' % options.count
+    for layout in ('dict', 'slots'):
+        print '  %-6s %10.1f MB  %6d bytes/instance' % (layout,
+                result[layout] / 1024.0,
+                result[layout] * 1024 / options.count)
+    print '  saved  %9.1f%%' % (100.0 * (result['dict'] - result['slots']) / result['dict'])
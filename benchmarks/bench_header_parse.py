@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Category and Link header parsing.
+
+Compares the single-pass parser (iter_web_headers) with the previous regular
+expression plus nested split_quoted implementation on 1MB header values.
+
+Usage: bench_header_parse.py [-s SIZE]
+"""
+
+import optparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.http.header import HttpHeadersBase, HttpCategoryHeaders, HttpLinkHeaders
+from occi.http.utils import split_quoted
+
+class SplitCategoryHeaders(HttpHeadersBase):
+    """Replica of the previous Category/Link header parser."""
+    HEADER_VALUE_REGEXP = re.compile(r'^\s*([^;]+)\s*')
+
+    def _from_string(self, header_string):
+        m = self.HEADER_VALUE_REGEXP.match(header_string)
+        value = m.groups()[0]
+        attributes = []
+        for s in split_quoted(header_string[m.end():], delimiter=';'):
+            if not s:
+                continue
+            k, v = split_quoted(s.strip(), delimiter='=', remove_quotes=True)
+            attributes.append((k, v))
+        return (value, attributes)
+
+class SplitLinkHeaders(SplitCategoryHeaders):
+    HEADER_VALUE_REGEXP = re.compile(r'^\s*<([^>]+)>\s*')
+
+def bench(label, func, number=3):
+    t = min(timeit.repeat(func, number=1, repeat=number))
+    print '  %-32s %10.2f ms' % (label, t * 1e3)
+    return t
+
+def repeat(s, size):
+    return ', '.join([s] * (size // (len(s) + 2)))
+
+def compare(label, old, new, s):
+    print label
+    assert old().parse(s) == new().parse(s)
+    t0 = bench('regexp + split_quoted', lambda: old().parse(s))
+    t1 = bench('single pass', lambda: new().parse(s))
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Header parser benchmark')
+    parser.add_option('-s', dest='size', type='int', default=1 << 20,
+            help='Size of header values in bytes (default 1MB)')
+    (options, args) = parser.parse_args()
+
+    categories = repeat('compute; scheme="http://schemas.ogf.org/occi/infrastructure#"; '
+            'class="kind"; title="Compute \\"VM\\" Resource"; location="/compute/"',
+            options.size)
+    links = repeat('</api/storage/san1>; rel="http://schemas.ogf.org/occi/infrastructure#storage"; '
+            'self="/api/link/storage/1"; title="Quorum Disk"; device="sda"',
+            options.size)
+
+    print 'header values of %d bytes' % options.size
+    compare('Category', SplitCategoryHeaders, HttpCategoryHeaders, categories)
+    compare('Link', SplitLinkHeaders, HttpLinkHeaders, links)
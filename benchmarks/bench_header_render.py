@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Header and text/plain rendering of Compute resource instances.
+
+Compares the cached, join-based serialization with the previous
+implementation (per-character escape_quotes, isinstance chain and string
+formatting for every attribute, body built by string concatenation).
+
+Usage: bench_header_render.py [-n COUNT]
+"""
+
+import optparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.core import Resource
+from occi.http.dataobject import DataObject, URLTranslator
+from occi.http.header import HttpHeadersBase, HttpWebHeadersBase, HttpAttributeHeaders
+from occi.http.renderer import HeaderRenderer, TextPlainRenderer, TextURIListRenderer
+from occi.ext.infrastructure import *
+
+def escape_quotes(s, quotechar='"', escapechar='\\'):
+    """Replica of the previous escape_quotes implementation."""
+    buf = ''
+    for c in s:
+        if c == quotechar or c == escapechar:
+            buf += escapechar
+        buf += c
+    return buf
+
+def attribute_to_string(self, header):
+    k, v = header
+    if isinstance(v, int):
+        value_str = str(v)
+    elif isinstance(v, float):
+        value_str = '%.2f' % v
+    elif isinstance(v, bool):
+        value_str = str(v).lower()
+    else:
+        value_str = '"%s"' % escape_quotes(str(v))
+    return '%s=%s' % (k, value_str)
+
+def web_to_string(self, header):
+    item, attributes = header
+    return '; '.join(
+        ['%s' % item] +
+        ['%s="%s"' % (name, escape_quotes(str(value))) for name, value in attributes])
+
+def text_plain_render(self, objects):
+    HeaderRenderer.render(self, objects)
+    for name, value in self.headers[1:]:
+        self.body += '%s: %s\r\n' % (name, value)
+    self.headers = []
+    self.headers.append(('Content-Type', '%s; charset=utf-8' % self.media_type))
+
+def uri_list_render(self, objects):
+    self.headers.append(('Content-Type', '%s; charset=utf-8' % self.media_type))
+    for obj in objects:
+        if obj.location:
+            self.body += '%s\r\n' % obj.location
+
+PREVIOUS = [
+    (HttpAttributeHeaders, 'headers', HttpHeadersBase.headers.im_func),
+    (HttpAttributeHeaders, '_to_string', attribute_to_string),
+    (HttpWebHeadersBase, '_to_string', web_to_string),
+    (TextPlainRenderer, 'render', text_plain_render),
+    (TextURIListRenderer, 'render', uri_list_render),
+]
+
+def bench(label, func, number=3):
+    t = min(timeit.repeat(func, number=1, repeat=number))
+    print '  %-32s %10.2f ms' % (label, t * 1e3)
+    return t
+
+def compare(label, func):
+    print label
+    current = [(cls, name, cls.__dict__[name]) for cls, name, f in PREVIOUS]
+    for cls, name, f in PREVIOUS:
+        setattr(cls, name, f)
+    try:
+        expected = func()
+        t0 = bench('previous', func)
+    finally:
+        for cls, name, f in current:
+            setattr(cls, name, f)
+    assert func() == expected
+    t1 = bench('cached/join', func)
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
+
+def render_each(renderer_type, objects):
+    result = []
+    for obj in objects:
+        r = renderer_type()
+        r.render(obj)
+        result.append((r.headers, r.body))
+    return result
+
+def render_all(renderer_type, objects):
+    r = renderer_type()
+    r.render(objects)
+    return r.headers, r.body
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Header rendering benchmark')
+    parser.add_option('-n', dest='count', type='int', default=10000,
+            help='Number of Compute resource instances (default 10000)')
+    (options, args) = parser.parse_args()
+
+    translator = URLTranslator('http://example.com/api/')
+    objects = []
+    for i in xrange(options.count):
+        compute = Resource(ComputeKind)
+        compute.occi_import_attributes([
+            ('occi.core.id', str(uuid.uuid4())),
+            ('occi.core.title', 'vm "%d"' % i),
+            ('occi.compute.cores', str(i % 16)),
+            ('occi.compute.speed', '2.67'),
+            ('occi.compute.memory', '%d.0' % (i % 64)),
+            ('occi.compute.state', 'active')], validate=False)
+        compute.occi_set_applicable_action(ComputeStopActionCategory)
+        obj = DataObject(translator=translator)
+        obj.load_from_entity(compute)
+        objects.append(obj)
+
+    print '%d Compute resource instances' % len(objects)
+    compare('text/occi, one per request',
+            lambda: render_each(HeaderRenderer, objects))
+    compare('text/plain, one per request',
+            lambda: render_each(TextPlainRenderer, objects))
+    compare('text/uri-list, collection',
+            lambda: render_all(TextURIListRenderer, objects))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Cyclic garbage collector cost of a Resource/Link topology.
+
+Builds a ring of Resources where each Resource links to the next one, with
+the Link endpoints stored either as Entity instances (reference cycles) or
+as weak EntityRefs. Reports the duration of a full collection while the
+topology is alive and after it has been dropped.
+
+Weak EntityRefs only help once the topology is dropped, since it is then
+freed by reference counting. A collection while the topology is alive takes
+about as long either way, because the collector still traverses every
+tracked container.
+
+Usage: bench_link_gc.py [-n COUNT]
+"""
+
+import gc
+import optparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.core import Resource, Link, EntityRef, ResourceKind, LinkKind
+
+def build(count, use_refs):
+    resources = []
+    for i in xrange(count):
+        resource = Resource(ResourceKind)
+        resource.occi_set_attribute('occi.core.id', uuid.uuid4())
+        resources.append(resource)
+    for i, source in enumerate(resources):
+        target = resources[(i + 1) % count]
+        link = Link(LinkKind)
+        link.occi_set_attribute('occi.core.id', uuid.uuid4())
+        if use_refs:
+            link.occi_set_attribute('occi.core.source', EntityRef.for_entity(source))
+            link.occi_set_attribute('occi.core.target', EntityRef.for_entity(target))
+        else:
+            link.occi_set_attribute('occi.core.source', source)
+            link.occi_set_attribute('occi.core.target', target)
+        source.links.append(link)
+    return resources
+
+def timed_collect():
+    t0 = timeit.default_timer()
+    collected = gc.collect()
+    return timeit.default_timer() - t0, collected
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Link topology GC benchmark')
+    parser.add_option('-n', dest='count', type='int', default=100000,
+            help='Number of Resources (default 100000)')
+    (options, args) = parser.parse_args()
+
+    for label, use_refs in (('Entity endpoints', False), ('EntityRef endpoints', True)):
+        gc.collect()
+        topology = build(options.count, use_refs)
+        t_alive, n = timed_collect()
+        del topology
+        t_dropped, collected = timed_collect()
+        print label
+        print '  %-36s %10.1f ms' % ('full collection, topology alive', t_alive * 1e3)
+        print '  %-36s %10.1f ms' % ('full collection, topology dropped', t_dropped * 1e3)
+        print '  %-36s %10d' % ('objects freed by the collector', collected)
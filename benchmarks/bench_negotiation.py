@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Content negotiation of typical requests.
+
+Compares negotiating the parser and renderer of each request from scratch with
+the memoized negotiation keyed by the raw Content-Type and Accept headers.
+
+Usage: bench_negotiation.py [-n REQUESTS]
+"""
+
+import optparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.http import header, parser, renderer
+from occi.http.parser import get_parser
+from occi.http.renderer import get_renderer
+
+REQUESTS = [
+    ('text/occi', 'text/occi'),
+    ('text/plain; charset=utf-8', 'text/plain, */*;q=0.1'),
+    ('text/plain', 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'),
+    (None, 'text/*, text/occi;q=0.9'),
+    (None, None),
+]
+
+def bench(label, func, number=3):
+    t = min(timeit.repeat(func, number=1, repeat=number))
+    print '  %-32s %10.2f ms' % (label, t * 1e3)
+    return t
+
+def negotiate(count):
+    for i in xrange(count):
+        content_type, accept = REQUESTS[i % len(REQUESTS)]
+        p = get_parser(content_type)
+        if accept:
+            p._parse_accept_header(accept)
+        get_renderer(p.accept_types, accept_header=p.accept_header)
+
+def negotiate_uncached(count):
+    for i in xrange(count):
+        header._accept_cache.clear()
+        parser._negotiated.clear()
+        renderer._negotiated.clear()
+        content_type, accept = REQUESTS[i % len(REQUESTS)]
+        p = get_parser(content_type)
+        if accept:
+            p._parse_accept_header(accept)
+        get_renderer(p.accept_types, accept_header=p.accept_header)
+
+if __name__ == '__main__':
+    optparser = optparse.OptionParser(description='Content negotiation benchmark')
+    optparser.add_option('-n', dest='count', type='int', default=100000,
+            help='Number of requests (default 100000)')
+    (options, args) = optparser.parse_args()
+
+    print '%d requests' % options.count
+    t0 = bench('uncached', lambda: negotiate_uncached(options.count))
+    t1 = bench('memoized', lambda: negotiate(options.count))
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Location lookups in a CategoryRegistry with many user-defined Mixins.
+
+Compares the LocationIndex path trie with the previous dictionary plus linear
+`startswith` scan.
+
+Usage: bench_registry_locations.py [-n COUNT]
+"""
+
+import optparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.core import CategoryRegistry, Mixin
+from occi.ext.infrastructure import *
+
+class DictLocations(object):
+    """Replica of the previous location lookup implementation."""
+    def __init__(self, registry):
+        self._locations = {}
+        for category in registry.all():
+            if getattr(category, 'location', None):
+                self._locations[category.location] = category
+
+    def lookup_location(self, path):
+        return self._locations.get(path.lstrip('/'))
+
+    def lookup_recursive(self, path):
+        loc = path.lstrip('/')
+        categories = []
+        for location, category in self._locations.iteritems():
+            if location.startswith(loc):
+                categories.append(category)
+        return categories
+
+def build_registry(count):
+    registry = CategoryRegistry()
+    for category in (ComputeKind, NetworkKind, IPNetworkMixin, StorageKind,
+            NetworkInterfaceKind, IPNetworkInterfaceMixin, StorageLinkKind):
+        registry.register(category)
+    for i in xrange(count):
+        registry.register(Mixin('tag%d' % i, 'http://example.com/occi/user#',
+            userdefined=True, location='user/%d/tag%d/' % (i % 100, i)))
+    return registry
+
+def bench(label, func, number):
+    t = min(timeit.repeat(func, number=number, repeat=3))
+    print '  %-32s %10.2f us/op' % (label, t / number * 1e6)
+    return t
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='Registry location benchmark')
+    parser.add_option('-n', dest='count', type='int', default=10000,
+            help='Number of user-defined Mixin locations (default 10000)')
+    (options, args) = parser.parse_args()
+
+    t0 = timeit.default_timer()
+    registry = build_registry(options.count)
+    print '%d locations, registered in %.3f s' % (options.count,
+            timeit.default_timer() - t0)
+    old = DictLocations(registry)
+
+    for name, impl in (('dict', old), ('trie', registry)):
+        print name
+        bench('lookup_location(compute/)',
+                lambda: impl.lookup_location('/compute/'), 10000)
+        bench('lookup_recursive(link/)',
+                lambda: impl.lookup_recursive('/link/'), 100)
+        bench('lookup_recursive(user/42/)',
+                lambda: impl.lookup_recursive('/user/42/'), 100)
+    print 'trie'
+    bench('lookup_location_prefix(entity)',
+            lambda: registry.lookup_location_prefix('/link/storage/10000000-0000-4000-0000-000000000000'), 10000)
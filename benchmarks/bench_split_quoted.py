@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""split_quoted on 1MB header values and text/plain bodies.
+
+Compares the compiled regular expression with the previous character by character
+implementation, both directly and through the HTTP header parsers.
+
+Usage: bench_split_quoted.py [-s SIZE]
+"""
+
+import optparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from occi.http import header, utils
+from occi.http.header import HttpAttributeHeaders
+from occi.http.parser import TextPlainParser
+
+def split_quoted_chars(s, delimiter=',', quotechar='"', escapechar='\\', remove_quotes=False):
+    """Replica of the previous split_quoted implementation."""
+    l = []
+    quote = False
+    escape = False
+    buf = None
+    for c in s:
+        if c == escapechar:
+            escape = not escape
+            if escape and remove_quotes:
+                if buf is None:
+                    buf = ''
+                continue
+        elif c == quotechar and not escape:
+            quote = not quote
+            if remove_quotes:
+                if buf is None:
+                    buf = ''
+                continue
+        elif c == delimiter and not escape and not quote:
+            l.append(buf)
+            buf = None
+            continue
+        elif escape:
+            escape = False
+
+        if buf is None:
+            buf = ''
+        buf += c
+    if buf is not None:
+        l.append(buf)
+    return l
+
+def bench(label, func, number=3):
+    t = min(timeit.repeat(func, number=1, repeat=number))
+    print '  %-32s %10.2f ms' % (label, t * 1e3)
+    return t
+
+def repeat(s, size):
+    return ', '.join([s] * (size // (len(s) + 2)))
+
+def compare(label, func):
+    print label
+    header.split_quoted = split_quoted_chars
+    try:
+        expected = func()
+        t0 = bench('character by character', func)
+    finally:
+        header.split_quoted = utils.split_quoted
+    assert func() == expected
+    t1 = bench('compiled', func)
+    print '  %-32s %10.1fx' % ('speedup', t0 / t1)
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description='split_quoted benchmark')
+    parser.add_option('-s', dest='size', type='int', default=1 << 20,
+            help='Size of header values in bytes (default 1MB)')
+    (options, args) = parser.parse_args()
+
+    attributes = repeat('occi.compute.hostname="vm \\"01\\", example.com", '
+            'occi.compute.cores=4, occi.compute.speed=2.67', options.size)
+    quoted = 'occi.core.summary="%s"' % ('x' * options.size)
+    line = 'X-OCCI-Attribute: occi.core.title="vm \\"%d\\""\n'
+    body = 'Category: compute; scheme="http://schemas.ogf.org/occi/infrastructure#"\n' + \
+            ''.join([line % i for i in xrange(options.size // len(line))])
+
+    print 'header values of %d bytes' % options.size
+    compare('split_quoted(X-OCCI-Attribute)',
+            lambda: header.split_quoted(attributes))
+    compare('split_quoted(quoted value, "=")',
+            lambda: header.split_quoted(quoted, delimiter='=', remove_quotes=True))
+    compare('HttpAttributeHeaders.parse',
+            lambda: HttpAttributeHeaders().parse(attributes))
+    compare('TextPlainParser.parse (body)',
+            lambda: TextPlainParser().parse(body=body) or None)
@@ -17,6 +17,8 @@
 # along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import threading
+
 try:
     from collections import OrderedDict
 except ImportError:
@@ -25,4 +27,47 @@ except ImportError:
     except ImportError:
         OrderedDict = dict
 
+class LRUCache(object):
+    """Bounded mapping discarding the least recently used entry when more
+    than `maxsize` entries are stored. Safe for use by multiple threads.
+
+    >>> cache = LRUCache(2)
+    >>> cache.put('a', 1) ; cache.put('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.put('c', 3)
+    >>> cache.get('b'), cache.get('a'), cache.get('c')
+    (None, 1, 3)
+    >>> cache.clear()
+    >>> len(cache)
+    0
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                del self._data[iter(self._data).next()]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
 __version__ = '0.7'
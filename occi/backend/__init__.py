@@ -18,7 +18,7 @@
 #
 
 from abc import ABCMeta
-from occi.core import CategoryRegistry
+from occi.core import CategoryRegistry, EntityRef, LinkKind
 
 class ServerBackend(object):
     __metaclass__ = ABCMeta
@@ -60,7 +60,11 @@ class ServerBackend(object):
         returned `Entity` instances.
 
         :keyword categories: A list of `Category` instances a matching `Entity`
-            instance must be a associated with.
+            instance must be a associated with. An `Entity` instance is
+            associated with a `Category` if its `Kind` or one of its `Mixin`s
+            is related to the `Category`, see `Category.is_related()`. Use
+            `CategoryRegistry.lookup_descendants()` to get the full set of
+            matching categories.
         :keyword attributes: A list of attribute key-value pairs which must all
             be present in a matching `Entity` instance.
         :keyword user: The authenticated user.
@@ -68,6 +72,34 @@ class ServerBackend(object):
         """
         raise self.ServerBackendError('Server Backend must implement filter_entities')
 
+    def filter_links(self, source=None, target=None, user=None):
+        """Return a list of `Link` objects with the specified source and/or
+        target `Resource`.
+
+        The default implementation filters the `Link` instances returned by
+        `filter_entities()`. A backend keeping an index of the links of each
+        `Resource` should override this method.
+
+        :keyword source: Entity ID of the source `Resource`.
+        :keyword target: Entity ID of the target `Resource`.
+        :keyword user: The authenticated user.
+        :return: A list of `Link` instances matching the filter parameters.
+        """
+        endpoints = []
+        if source is not None:
+            endpoints.append(('occi.core.source', EntityRef(source).id))
+        if target is not None:
+            endpoints.append(('occi.core.target', EntityRef(target).id))
+        links = []
+        for link in self.filter_entities(categories=[LinkKind], user=user):
+            for name, entity_id in endpoints:
+                # Skip links without source or target
+                if getattr(link.occi_get_attribute(name), 'id', None) != entity_id:
+                    break
+            else:
+                links.append(link)
+        return links
+
     def save_entities(self, entities=None, delete_entity_ids=None, user=None):
         """Save and delete a set of entities (resource instances) in a single
         atomic operation.
@@ -81,6 +113,29 @@ class ServerBackend(object):
         """
         raise self.ServerBackendError('Server Backend must implement save_entities')
 
+    def update_entities(self, changes, user=None):
+        """Save the modifications made to a set of existing entities (resource
+        instances) in a single atomic operation. Only the modified attributes,
+        Mixins and Actions are given, see `Entity.occi_get_changes()`.
+
+        The default implementation applies the changes to the entities
+        loaded using `get_entity()` and saves the complete entities using
+        `save_entities()`.
+
+        :param changes: A list of `EntityChanges` objects.
+        :keyword user: The authenticated user.
+        :return: A list of the persisted `Entity` objects.
+        """
+        entities = []
+        for change in changes:
+            entity = self.get_entity(change.entity.id, user=user)
+            change.apply_to(entity)
+            entities.append(entity)
+        self.save_entities(entities, user=user)
+        for change in changes:
+            change.entity.occi_clear_changes()
+        return [change.entity for change in changes]
+
     def exec_action(self, action, entity, payload=None, user=None):
         """Execute `Action` on the given `Entity` (resource instance).
 
@@ -20,12 +20,18 @@
 import uuid
 
 from occi import OrderedDict
-from occi.core import Entity, Resource, Link, Mixin
+from occi.core import Entity, EntityRef, Resource, Link, Mixin, intern_uuid
 from occi.backend import ServerBackend
 
 class DummyBackend(ServerBackend):
     """Very simple (and inefficient) in-memory backend for test purposes.
 
+    Entity instances are handed out as copy-on-write clones of the stored
+    instances, i.e. modifications are not visible until saved.
+
+    Links are indexed by source and target Resource. The links of a Resource
+    are filled in from the index when the Resource is handed out.
+
     >>> backend = DummyBackend()
     >>> from occi.ext.infrastructure import *
     >>> t = backend.save_entities([ComputeKind.entity_type(ComputeKind)])
@@ -40,10 +46,49 @@ class DummyBackend(ServerBackend):
     4
     >>> len(backend.filter_entities(categories=[ComputeKind]))
     2
+    >>> len(backend.filter_entities(categories=[ResourceKind]))
+    3
     >>> len(backend.filter_entities(categories=[ComputeKind], attributes=[('occi.compute.memory', 2.0)]))
     1
-    >>> backend.get_entity(s_compute.id) == compute
+    >>> compute = backend.get_entity(s_compute.id)
+    >>> compute.id == s_compute.id
+    True
+    >>> compute.occi_get_changes()
+    >>> compute.occi_set_attribute('occi.core.title', 'My VM')
+    >>> backend.get_entity(s_compute.id).occi_get_attribute('occi.core.title')
+    >>> changes = compute.occi_get_changes()
+    >>> changes.attributes
+    [('occi.core.title', 'My VM')]
+    >>> [entity.id for entity in backend.update_entities([changes])] == [compute.id]
     True
+    >>> compute.occi_get_changes()
+    >>> backend.get_entity(s_compute.id).occi_get_attribute('occi.core.title')
+    'My VM'
+
+    The changes are applied all or nothing.
+
+    >>> compute.occi_set_attribute('occi.core.title', 'Renamed')
+    >>> link = backend.get_entity(s_link[0].id)
+    >>> link.occi_set_attribute('occi.core.target', EntityRef(intern_uuid('00000000-0000-4000-0000-000000000000')))
+    >>> backend.update_entities([compute.occi_get_changes(), link.occi_get_changes()])
+    Traceback (most recent call last):
+    DoesNotExist: "00000000-0000-4000-0000-000000000000": Resource instance does not exist
+    >>> backend.get_entity(s_compute.id).occi_get_attribute('occi.core.title')
+    'My VM'
+    >>> [l.id for l in backend.get_entity(s_compute.id).occi_list_links()] == [s_link[0].id]
+    True
+    >>> [l.id for l in backend.filter_links(target=s_storage.id)] == [s_link[0].id]
+    True
+    >>> link = backend.get_entity(s_compute.id).links[0]
+    >>> link.occi_set_attribute('occi.core.title', 'Boot disk')
+    >>> backend.get_entity(s_compute.id).links[0].occi_get_attribute('occi.core.title')
+    >>> backend.filter_links(source=s_compute.id)[0].occi_get_attribute('occi.core.title')
+    >>> backend.save_entities(delete_entity_ids=[s_storage.id])
+    []
+    >>> backend.filter_links(source=s_compute.id)
+    []
+    >>> backend.get_entity(s_compute.id).occi_list_links()
+    []
     >>> backend.save_entities(delete_entity_ids=[entity.id for entity in t])
     []
     >>> [entity.id for entity in backend.filter_entities(categories=[ComputeKind])] == [s_compute.id]
@@ -53,18 +98,42 @@ class DummyBackend(ServerBackend):
     def __init__(self):
         super(DummyBackend, self).__init__()
         self._db = OrderedDict()
+        self._links_by_source = {}
+        self._links_by_target = {}
         self._user_mixins = {}
 
     def auth_user(self, identity, secret=None, method=None, user=None):
         return None
 
     def get_entity(self, entity_id, user=None):
-        entity_id = str(entity_id)
+        return self._hand_out(self._get_entity(entity_id))
+
+    def _hand_out(self, entity):
+        """Return a clone of a stored Entity instance, including clones of
+        the links of a Resource.
+        """
+        entity = entity.occi_clone()
+        if isinstance(entity, Resource):
+            entity.links = [link.occi_clone() for link in
+                    self._links_by_source.get(entity.id, {}).itervalues()]
+        return entity
+
+    def _get_entity(self, entity_id):
+        """Return the stored Entity instance."""
         try:
-            return self._db[entity_id]
+            return self._db[self._key(entity_id)]
         except KeyError:
             raise Entity.DoesNotExist(entity_id)
 
+    def _key(self, entity_id):
+        """Entity instances are stored by UUID."""
+        if isinstance(entity_id, uuid.UUID):
+            return entity_id
+        try:
+            return intern_uuid(str(entity_id))
+        except ValueError:
+            raise Entity.DoesNotExist(entity_id)
+
     def filter_entities(self, categories=None, attributes=None, user=None):
         result = []
         for entity_id, entity in self._db.iteritems():
@@ -73,7 +142,10 @@ class DummyBackend(ServerBackend):
             # Filter on Categories
             cats = entity.occi_list_categories()
             for cat in categories or ():
-                if str(cat) not in cats:
+                for c in cats:
+                    if c.is_related(cat):
+                        break
+                else:
                     skip=True
                     break
             if skip: continue
@@ -87,10 +159,26 @@ class DummyBackend(ServerBackend):
                         break
             if skip: continue
 
-            result.append(entity)
+            result.append(self._hand_out(entity))
 
         return result
 
+    def filter_links(self, source=None, target=None, user=None):
+        try:
+            if source is not None:
+                links = self._links_by_source.get(self._key(source), {}).values()
+                if target is not None:
+                    target = self._key(target)
+                    links = [l for l in links
+                            if l.occi_get_attribute('occi.core.target').id == target]
+            elif target is not None:
+                links = self._links_by_target.get(self._key(target), {}).values()
+            else:
+                links = [e for e in self._db.itervalues() if isinstance(e, Link)]
+        except Entity.DoesNotExist:
+            return []
+        return [self._hand_out(link) for link in links]
+
     def save_entities(self, entities=None, delete_entity_ids=None, user=None):
         if delete_entity_ids:
             self._delete_entities(delete_entity_ids, user=user)
@@ -98,48 +186,125 @@ class DummyBackend(ServerBackend):
         for entity in entities or ():
             # Generate ID if new instance
             if not entity.id:
-                entity.occi_set_attribute('occi.core.id', uuid.uuid4())
+                entity.occi_set_attribute('occi.core.id', intern_uuid(str(uuid.uuid4())))
 
             # Links
             if isinstance(entity, Link):
-                source = self.get_entity(entity.occi_get_attribute('occi.core.source').id, user=user)
-                target = self.get_entity(entity.occi_get_attribute('occi.core.target').id, user=user)
-                entity.occi_set_attribute('occi.core.source', source)
-                entity.occi_set_attribute('occi.core.target', target)
-                links = []
-                for l in source.links:
-                    if l.id != source.id:
-                        links.append(l)
-                links.append(entity)
-                source.links = links
-
-            self._db[str(entity.id)] = entity
+                source = self._get_entity(entity.occi_get_attribute('occi.core.source').id)
+                target = self._get_entity(entity.occi_get_attribute('occi.core.target').id)
+                entity.occi_set_attribute('occi.core.source', EntityRef.for_entity(source))
+                entity.occi_set_attribute('occi.core.target', EntityRef.for_entity(target))
+
+            entity.occi_clear_changes()
+            stored = entity.occi_clone()
+            replaced = self._db.get(entity.id)
+            if isinstance(replaced, Link):
+                self._unindex_link(replaced)
+            self._db[entity.id] = stored
+
+            if isinstance(stored, Link):
+                self._index_link(stored)
+            elif isinstance(stored, Resource):
+                # The links of a Resource are kept in the link index only
+                stored.links = []
+                if replaced is not None:
+                    self._update_link_refs(stored)
             saved_entities.append(entity)
         return saved_entities
 
-    def _delete_entities(self, entity_ids, user=None):
-        for entity_id in entity_ids:
-            entity_id = str(entity_id)
+    def _index_link(self, link):
+        source_id = link.occi_get_attribute('occi.core.source').id
+        target_id = link.occi_get_attribute('occi.core.target').id
+        self._links_by_source.setdefault(source_id, OrderedDict())[link.id] = link
+        self._links_by_target.setdefault(target_id, OrderedDict())[link.id] = link
+
+    def _unindex_link(self, link):
+        for index, name in ((self._links_by_source, 'occi.core.source'),
+                (self._links_by_target, 'occi.core.target')):
+            resource_id = link.occi_get_attribute(name).id
+            links = index.get(resource_id)
+            if links is not None:
+                links.pop(link.id, None)
+                if not links:
+                    del index[resource_id]
+
+    def _update_link_refs(self, resource):
+        """Point Links referring to a replaced Resource to the new instance."""
+        for index, name in ((self._links_by_source, 'occi.core.source'),
+                (self._links_by_target, 'occi.core.target')):
+            for link in index.get(resource.id, {}).itervalues():
+                link.occi_set_attribute(name, EntityRef.for_entity(resource))
+                link.occi_clear_changes()
+
+    def update_entities(self, changes, user=None):
+        # Apply all changes to clones of the stored instances first, leaving
+        # the stored instances untouched if any of the changes fails
+        updated = OrderedDict()
+        for change in changes:
+            key = self._key(change.entity.id)
             try:
-                entity = self._db[entity_id]
-                if isinstance(entity, Resource):
-                    for l in entity.links:
-                        self._db.pop(l.id, None)
-                elif isinstance(entity, Link):
-                    try:
-                        entity.source.links.remove(entity)
-                    except ValueError:
-                        pass
-                del self._db[entity_id]
+                entity = updated[key]
             except KeyError:
-                raise Entity.DoesNotExist(entity_id)
+                entity = updated[key] = self._get_entity(key).occi_clone()
+            change.apply_to(entity)
+            if isinstance(entity, Link):
+                for name, value in change.attributes:
+                    if name in ('occi.core.source', 'occi.core.target'):
+                        resource = self._get_entity(getattr(value, 'id', None))
+                        entity.occi_set_attribute(name, EntityRef.for_entity(resource))
+
+        # Replace the stored instances and update the link index
+        for key, entity in updated.iteritems():
+            replaced = self._db[key]
+            if isinstance(replaced, Link):
+                self._unindex_link(replaced)
+            self._db[key] = entity
+        for entity in updated.itervalues():
+            if isinstance(entity, Link):
+                for name in ('occi.core.source', 'occi.core.target'):
+                    resource = self._db[entity.occi_get_attribute(name).id]
+                    entity.occi_set_attribute(name, EntityRef.for_entity(resource))
+                self._index_link(entity)
+            elif isinstance(entity, Resource):
+                self._update_link_refs(entity)
+            entity.occi_clear_changes()
+
+        updated_entities = []
+        for change in changes:
+            change.entity.occi_clear_changes()
+            updated_entities.append(change.entity)
+        return updated_entities
+
+    def _delete_entities(self, entity_ids, user=None):
+        cascaded = set()
+        for entity_id in entity_ids:
+            if self._key(entity_id) in cascaded:
+                continue
+            entity = self._get_entity(entity_id)
+            if isinstance(entity, Resource):
+                # Delete outbound and inbound links
+                links = self._links_by_source.get(entity.id, {}).values()
+                links += self._links_by_target.get(entity.id, {}).values()
+                for link in links:
+                    if self._db.pop(link.id, None) is not None:
+                        self._unindex_link(link)
+                        cascaded.add(link.id)
+            elif isinstance(entity, Link):
+                self._unindex_link(entity)
+            del self._db[entity.id]
 
     def exec_action(self, action, entity, payload=None, user=None):
         try:
-            return getattr(entity, 'exec_action')(action, payload=payload)
+            result = getattr(entity, 'exec_action')(action, payload=payload)
         except AttributeError:
             return None
 
+        # Save any state changes made by the Action
+        changes = entity.occi_get_changes()
+        if changes is not None:
+            self.update_entities([changes], user=user)
+        return result
+
     def exec_action_on_collection(self, action, collection, payload=None, user=None):
         # FIXME: make atomic
         for entity in self.filter_entities(categories=[collection], user=user):
@@ -149,12 +314,12 @@ class DummyBackend(ServerBackend):
     def add_user_category(self, category, user=None):
         if not isinstance(category, Mixin):
             raise self.InvalidOperation('Permission denied')
-        self._user_mixins[str(category)] = category
+        self._user_mixins[category.id] = category
         return category
 
     def remove_user_category(self, category, user=None):
         try:
-            del self._user_mixins[str(category)]
+            del self._user_mixins[category.id]
         except KeyError:
             raise self.InvalidOperation('Permission denied')
 
@@ -0,0 +1,612 @@
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import struct
+import uuid
+
+from occi.core import (Attribute, IntAttribute, FloatAttribute, BoolAttribute,
+        UUIDAttribute, ResourceAttribute, Category, ExtCategory, Kind, Mixin,
+        Entity, EntityRef, Resource, Link, intern_uuid)
+
+# Message layout:
+#
+#   MAGIC, VERSION, message type (ENTITIES or CATEGORIES)
+#   string table: count, then length-prefixed UTF-8 strings
+#   record count, then the records
+#
+# All counts, lengths and string table indices are unsigned LEB128 varints.
+# Category IDs, attribute names and attribute type names are written once
+# to the string table and referred to by index.
+
+MAGIC = 'OCB'
+VERSION = 1
+
+ENTITIES = 'E'
+CATEGORIES = 'C'
+
+# Value type tags
+_NONE = 'N'
+_TRUE = 'T'
+_FALSE = 'F'
+_INT = 'i'
+_FLOAT = 'f'
+_STR = 's'
+_UNICODE = 'u'
+_UUID = 'U'
+_REF = 'R'
+
+_double = struct.Struct('>d')
+
+_attribute_types = dict([(cls.__name__, cls) for cls in (Attribute,
+    IntAttribute, FloatAttribute, BoolAttribute, UUIDAttribute,
+    ResourceAttribute)])
+_attribute_type_names = dict([(cls.type_name, cls) for cls in (Attribute,
+    IntAttribute, FloatAttribute, BoolAttribute, UUIDAttribute)])
+
+_category_types = {'K': Kind, 'M': Mixin, 'C': Category}
+
+class CodecError(Exception):
+    pass
+
+def _varint(n):
+    if n < 0x80:
+        return chr(n)
+    buf = []
+    while n >= 0x80:
+        buf.append(chr((n & 0x7f) | 0x80))
+        n >>= 7
+    buf.append(chr(n))
+    return ''.join(buf)
+
+class _Writer(object):
+    """Accumulates a message body and its string table."""
+
+    def __init__(self):
+        self.chunks = []
+        self.strings = {}
+        self.string_list = []
+
+    def index(self, s):
+        """Return the string table index of s."""
+        try:
+            return self.strings[s]
+        except KeyError:
+            i = self.strings[s] = len(self.string_list)
+            self.string_list.append(s)
+            return i
+
+    def string(self, s):
+        self.chunks.append(_varint(self.index(s)))
+
+    def count(self, n):
+        self.chunks.append(_varint(n))
+
+    def value(self, v):
+        append = self.chunks.append
+        t = v.__class__
+        if v is None:
+            append(_NONE)
+        elif t is bool:
+            append(v and _TRUE or _FALSE)
+        elif t is int or t is long:
+            append(_INT)
+            # Zig-zag encoding of signed integers
+            append(_varint(v << 1 if v >= 0 else ((-v) << 1) - 1))
+        elif t is float:
+            append(_FLOAT)
+            append(_double.pack(v))
+        elif t is str:
+            append(_STR)
+            append(_varint(len(v)))
+            append(v)
+        elif t is unicode:
+            v = v.encode('utf-8')
+            append(_UNICODE)
+            append(_varint(len(v)))
+            append(v)
+        elif isinstance(v, uuid.UUID):
+            append(_UUID)
+            append(v.bytes)
+        elif isinstance(v, (Entity, EntityRef)):
+            append(_REF)
+            append(self._id_bytes(v))
+            kind = isinstance(v, Entity) and v.occi_get_kind() or v.kind
+            if kind is None:
+                append('\0')
+            else:
+                # Index + 1, zero meaning no Kind
+                append(_varint(self.index(kind.id) + 1))
+        else:
+            raise CodecError('%r: unsupported attribute value type' % (v,))
+
+    def _id_bytes(self, entity):
+        entity_id = entity.id
+        if not isinstance(entity_id, uuid.UUID):
+            raise CodecError('%r: Entity without an ID' % (entity,))
+        return entity_id.bytes
+
+    def message(self, msg_type, n):
+        header = [MAGIC, chr(VERSION), msg_type, _varint(len(self.string_list))]
+        for s in self.string_list:
+            if isinstance(s, unicode):
+                s = s.encode('utf-8')
+            header.append(_varint(len(s)))
+            header.append(s)
+        header.append(_varint(n))
+        return ''.join(header) + ''.join(self.chunks)
+
+class _Reader(object):
+    """Reads the string table and values of a message."""
+
+    def __init__(self, data, msg_type, lookup=None):
+        if data[:3] != MAGIC:
+            raise CodecError('not an encoded OCCI message')
+        if data[3:4] != chr(VERSION):
+            raise CodecError('unsupported codec version %d' % ord(data[3:4] or '\0'))
+        if data[4:5] != msg_type:
+            raise CodecError('unexpected message type %r' % data[4:5])
+        self.data = data
+        self.lookup = lookup
+        self.pos = 5
+        self.strings = []
+        for i in xrange(self.count()):
+            s = self.bytes(self.count())
+            try:
+                s = intern(s)
+            except TypeError:
+                pass
+            self.strings.append(s)
+
+    def count(self):
+        data = self.data
+        pos = self.pos
+        try:
+            b = ord(data[pos])
+            pos += 1
+            if b < 0x80:
+                self.pos = pos
+                return b
+            n = b & 0x7f
+            shift = 7
+            while True:
+                b = ord(data[pos])
+                pos += 1
+                n |= (b & 0x7f) << shift
+                if b < 0x80:
+                    break
+                shift += 7
+        except IndexError:
+            raise CodecError('truncated message')
+        self.pos = pos
+        return n
+
+    def string(self):
+        return self.string_at(self.count())
+
+    def string_at(self, i):
+        try:
+            return self.strings[i]
+        except IndexError:
+            raise CodecError('malformed message: string index %d out of range' % i)
+
+    def bytes(self, n):
+        pos = self.pos
+        self.pos = pos + n
+        s = self.data[pos:pos + n]
+        if len(s) != n:
+            raise CodecError('truncated message')
+        return s
+
+    def value(self):
+        tag = self.bytes(1)
+        if tag == _STR:
+            return self.bytes(self.count())
+        elif tag == _INT:
+            n = self.count()
+            return int(n >> 1 if not n & 1 else -((n + 1) >> 1))
+        elif tag == _FLOAT:
+            return _double.unpack(self.bytes(8))[0]
+        elif tag == _UUID:
+            return self.uuid()
+        elif tag == _NONE:
+            return None
+        elif tag == _TRUE:
+            return True
+        elif tag == _FALSE:
+            return False
+        elif tag == _UNICODE:
+            return self.bytes(self.count()).decode('utf-8')
+        elif tag == _REF:
+            ref = EntityRef(self.uuid())
+            i = self.count()
+            if i and self.lookup is not None:
+                ref.kind = self.lookup(self.string_at(i - 1))
+            return ref
+        raise CodecError('malformed message: %r: unknown value type' % tag)
+
+    def uuid(self):
+        return intern_uuid(self.bytes(16).encode('hex'))
+
+def encode_entities(entities):
+    """Encode a list of Entity instances into a compact binary message.
+
+    Attribute values are encoded in native format. The Kind, Mixins and
+    applicable Actions are encoded by Category ID and the links of a
+    Resource by Link ID.
+
+    >>> from occi.core import *
+    >>> from occi.ext.infrastructure import *
+    >>> compute = Resource(ComputeKind, mixins=[IPNetworkInterfaceMixin])
+    >>> compute.occi_import_attributes([('occi.core.id', '10000000-0000-4000-0000-000000000000'), ('occi.core.title', u'My VM \\xe5'), ('occi.compute.cores', '2'), ('occi.compute.speed', '2.67'), ('occi.networkinterface.ip', '10.0.0.1')], validate=False)
+    >>> compute.occi_set_applicable_action(ComputeStartActionCategory)
+    >>> link = Link(StorageLinkKind)
+    >>> link.occi_set_attribute('occi.core.id', intern_uuid('20000000-0000-4000-0000-000000000000'))
+    >>> link.occi_set_attribute('occi.core.source', compute)
+    >>> link.occi_set_attribute('occi.core.target', compute)
+    >>> compute.links.append(link)
+    >>> data = encode_entities([compute, link])
+    >>> data[:5]
+    'OCB\\x01E'
+    >>> registry = CategoryRegistry()
+    >>> for category in (ComputeKind, StorageLinkKind, IPNetworkInterfaceMixin):
+    ...     registry.register(category)
+    >>> c, l = decode_entities(data, registry)
+    >>> c.__class__.__name__, c.occi_get_kind(), c.occi_get_mixins()
+    ('Resource', Kind('compute', 'http://schemas.ogf.org/occi/infrastructure#'), [Mixin('ipnetworkinterface', 'http://schemas.ogf.org/occi/infrastructure#')])
+    >>> c.occi_export_attributes() == compute.occi_export_attributes()
+    True
+    >>> c.occi_list_applicable_actions()
+    [Category('start', 'http://schemas.ogf.org/occi/infrastructure/compute/action#')]
+    >>> c.occi_list_links() == [l]
+    True
+    >>> l.occi_get_attribute('occi.core.source')
+    EntityRef(UUID('10000000-0000-4000-0000-000000000000'))
+    >>> l.occi_get_attribute('occi.core.source').resolve() is c
+    True
+    >>> from occi.http.dataobject import DataObject
+    >>> d = DataObject()
+    >>> d.load_from_entity(c)
+    >>> [link.link_location for link in d.links]
+    ['/link/storage/20000000-0000-4000-0000-000000000000']
+    >>> decode_entities(encode_entities([compute]), registry)[0].occi_list_links()
+    []
+    >>> c.occi_get_fingerprint() == compute.occi_get_fingerprint()
+    True
+    >>> c.occi_get_changes()
+    """
+    entities = list(entities)
+    w = _Writer()
+    count = w.count
+    string = w.string
+    value = w.value
+    for entity in entities:
+        string(entity.occi_get_kind().id)
+        mixins = entity.occi_get_mixins()
+        count(len(mixins))
+        for mixin in mixins:
+            string(mixin.id)
+        attributes = entity.occi_export_attributes(convert=False)
+        count(len(attributes))
+        for name, v in attributes:
+            string(name)
+            value(v)
+        actions = entity.occi_list_applicable_actions()
+        count(len(actions))
+        for action in actions:
+            string(action.id)
+        if isinstance(entity, Resource):
+            # Number of links + 1, zero meaning not a Resource
+            links = entity.occi_list_links()
+            count(len(links) + 1)
+            w.chunks.extend([w._id_bytes(link) for link in links])
+        else:
+            count(0)
+    return w.message(ENTITIES, len(entities))
+
+def decode_entities(data, registry):
+    """Decode a message created by `encode_entities()`. Category IDs are
+    resolved using the specified `CategoryRegistry`.
+
+    The links of a Resource are relinked to the Link instances decoded from
+    the same message, links not found in the message are left out. The
+    source/target of a Link refer to the Resources decoded from the same
+    message, otherwise they are decoded as `EntityRef`s to be resolved by the
+    `ServerBackend`. The decoded Entity instances have no pending changes.
+
+    >>> from occi.core import CategoryRegistry
+    >>> decode_entities('OCB\\x01E\\x00\\x01', CategoryRegistry())
+    Traceback (most recent call last):
+    CodecError: truncated message
+    >>> decode_entities('OCB\\x01E\\x00\\x01\\x05', CategoryRegistry())
+    Traceback (most recent call last):
+    CodecError: malformed message: string index 5 out of range
+    >>> decode_entities('OCB\\x02E', CategoryRegistry())
+    Traceback (most recent call last):
+    CodecError: unsupported codec version 2
+    >>> from occi.ext.infrastructure import ComputeKind
+    >>> decode_entities(encode_entities([Resource(ComputeKind)]), CategoryRegistry())
+    Traceback (most recent call last):
+    CodecError: "http://schemas.ogf.org/occi/infrastructure#compute": Category does not exist
+    """
+    snapshot = registry.snapshot()
+    r = _Reader(data, ENTITIES, snapshot.lookup_id)
+    entities = []
+    link_ids = []
+    try:
+        for i in xrange(r.count()):
+            kind = snapshot.lookup_id(r.string())
+            mixins = [snapshot.lookup_id(r.string()) for j in xrange(r.count())]
+            attributes = [(r.string(), r.value()) for j in xrange(r.count())]
+            actions = [r.string() for j in xrange(r.count())]
+            nlinks = r.count()
+            link_ids.append([r.uuid() for j in xrange(nlinks - 1)])
+
+            entity = kind.entity_type(kind, mixins=mixins)
+            for action in entity.occi_list_applicable_actions():
+                entity.occi_set_applicable_action(action, False)
+            for action in actions:
+                entity.occi_set_applicable_action(action)
+            entity.occi_import_attributes(attributes, convert=False,
+                    validate=False)
+            entities.append(entity)
+    except ValueError as e:
+        raise CodecError('malformed message: %s' % e)
+    except (Category.CategoryError, Entity.EntityError) as e:
+        raise CodecError(e)
+
+    # Relink Links and Link endpoints decoded from the same message
+    by_id = dict([(entity.id, entity) for entity in entities])
+    for entity, ids in zip(entities, link_ids):
+        if isinstance(entity, Link):
+            for name in ('occi.core.source', 'occi.core.target'):
+                ref = entity.occi_get_attribute(name)
+                resource = by_id.get(getattr(ref, 'id', None))
+                if resource is not None:
+                    entity.occi_set_attribute(name, EntityRef.for_entity(resource))
+        elif isinstance(entity, Resource):
+            entity.links = [by_id[link_id] for link_id in ids
+                    if isinstance(by_id.get(link_id), Link)]
+        entity.occi_clear_changes()
+    return entities
+
+def _dependency_order(categories):
+    """Order categories such that related categories and Action categories
+    precede the categories referring to them.
+    """
+    ordered = []
+    seen = set()
+    def visit(category):
+        if category.id in seen:
+            return
+        seen.add(category.id)
+        if category.related is not None:
+            visit(category.related)
+        for action in getattr(category, 'actions', ()):
+            visit(action)
+        ordered.append(category)
+    for category in categories:
+        visit(category)
+    return ordered
+
+def encode_categories(categories):
+    """Encode a list of Category/Kind/Mixin instances into a compact binary
+    message, including their related Categories and Action Categories.
+
+    >>> from occi.core import CategoryRegistry
+    >>> from occi.ext.infrastructure import *
+    >>> tagMixin = Mixin('tag', 'http://example.com/occi/user#', related=IPNetworkMixin, userdefined=True, location='tag/', defaults={'occi.network.allocation': 'dynamic'})
+    >>> data = encode_categories([tagMixin])
+    >>> registry = CategoryRegistry()
+    >>> [c.id for c in decode_categories(data, registry)]
+    ['http://schemas.ogf.org/occi/infrastructure/network#ipnetwork', 'http://example.com/occi/user#tag']
+    >>> tag = decode_categories(data, registry)[-1]
+    >>> tag, tag.location, tag.userdefined, tag.defaults.items()
+    (Mixin('tag', 'http://example.com/occi/user#'), 'tag/', True, [('occi.network.allocation', 'dynamic')])
+    >>> tag.attributes.values()
+    [Attribute('occi.network.address', required=False, mutable=True), Attribute('occi.network.gateway', required=False, mutable=True), Attribute('occi.network.allocation', required=False, mutable=True)]
+
+    Categories already known to the registry are reused:
+
+    >>> registry.register(IPNetworkMixin)
+    >>> decode_categories(data, registry)[-1].related is IPNetworkMixin
+    True
+    >>> kinds = decode_categories(encode_categories([ComputeKind]))
+    >>> kinds[-1].entity_type is ComputeKind.entity_type, kinds[-1].actions
+    (True, [Category('start', 'http://schemas.ogf.org/occi/infrastructure/compute/action#'), Category('stop', 'http://schemas.ogf.org/occi/infrastructure/compute/action#'), Category('restart', 'http://schemas.ogf.org/occi/infrastructure/compute/action#'), Category('suspend', 'http://schemas.ogf.org/occi/infrastructure/compute/action#')])
+    """
+    categories = _dependency_order(categories)
+    w = _Writer()
+    count = w.count
+    string = w.string
+    value = w.value
+    for category in categories:
+        if isinstance(category, Kind):
+            w.chunks.append('K')
+        elif isinstance(category, Mixin):
+            w.chunks.append('M')
+        else:
+            w.chunks.append('C')
+        string(category.term)
+        string(category.scheme)
+        value(category.title)
+
+        # Related Category ID + 1, zero meaning none
+        if category.related is None:
+            count(0)
+        else:
+            count(w.index(category.related.id) + 1)
+
+        count(len(category.unique_attributes))
+        for attr in category.unique_attributes.itervalues():
+            string(attr.name)
+            string(attr.__class__.__name__)
+            string(attr.type_name)
+            count(bool(attr.required) | bool(attr.mutable) << 1)
+        count(len(category.defaults))
+        for name, v in category.defaults.iteritems():
+            string(name)
+            value(v)
+
+        if isinstance(category, ExtCategory):
+            value(category.location)
+            count(len(category.actions))
+            for action in category.actions:
+                string(action.id)
+        if isinstance(category, Kind):
+            string('%s.%s' % (category.entity_type.__module__,
+                category.entity_type.__name__))
+        elif isinstance(category, Mixin):
+            value(category.userdefined)
+    return w.message(CATEGORIES, len(categories))
+
+def decode_categories(data, registry=None):
+    """Decode a message created by `encode_categories()`. Categories
+    registered in the specified `CategoryRegistry` are reused instead of
+    creating new instances.
+
+    >>> decode_categories('OCB\\x01C\\x00\\x01X')
+    Traceback (most recent call last):
+    CodecError: malformed message: 'X': unknown Category type
+    """
+    r = _Reader(data, CATEGORIES)
+    try:
+        snapshot = registry and registry.snapshot()
+        decoded = {}
+        def lookup(category_id):
+            if snapshot is not None:
+                try:
+                    return snapshot.lookup_id(category_id)
+                except Category.DoesNotExist:
+                    pass
+            try:
+                return decoded[category_id]
+            except KeyError:
+                raise CodecError('%s: unknown related Category' % category_id)
+
+        categories = []
+        for i in xrange(r.count()):
+            tag = r.bytes(1)
+            try:
+                cls = _category_types[tag]
+            except KeyError:
+                raise CodecError('malformed message: %r: unknown Category type' % tag)
+            term = r.string()
+            scheme = r.string()
+            kwargs = {'title': r.value()}
+            related = r.count()
+            if related:
+                kwargs['related'] = lookup(r.string_at(related - 1))
+
+            attributes = []
+            for j in xrange(r.count()):
+                name = r.string()
+                attr_type = _attribute_types.get(r.string())
+                type_name = r.string()
+                if attr_type is None:
+                    attr_type = _attribute_type_names.get(type_name, Attribute)
+                flags = r.count()
+                attributes.append(attr_type(name, required=bool(flags & 1),
+                    mutable=bool(flags & 2)))
+            kwargs['attributes'] = attributes
+            kwargs['defaults'] = [(r.string(), r.value()) for j in xrange(r.count())]
+
+            if cls is not Category:
+                kwargs['location'] = r.value()
+                kwargs['actions'] = [lookup(r.string()) for j in xrange(r.count())]
+            if cls is Kind:
+                kwargs['entity_type'] = _entity_type(r.string())
+            elif cls is Mixin:
+                kwargs['userdefined'] = r.value()
+
+            category = None
+            if snapshot is not None:
+                try:
+                    category = snapshot.lookup_id(scheme + term)
+                except Category.DoesNotExist:
+                    pass
+            if category is None:
+                category = cls(term, scheme, **kwargs)
+            decoded[category.id] = category
+            categories.append(category)
+    except ValueError as e:
+        raise CodecError('malformed message: %s' % e)
+    except Category.CategoryError as e:
+        raise CodecError(e)
+    return categories
+
+def _entity_type(name):
+    """Return the Entity sub-type with the given qualified name. Only classes
+    already defined in this process are considered, modules are never
+    imported on behalf of a message.
+
+    >>> _entity_type('occi.core.Resource')
+    <class 'occi.core.Resource'>
+    >>> _entity_type('os.system')
+    Traceback (most recent call last):
+    CodecError: os.system: unknown Entity type
+    """
+    types = [Entity]
+    for cls in types:
+        if '%s.%s' % (cls.__module__, cls.__name__) == name:
+            return cls
+        types.extend(cls.__subclasses__())
+    raise CodecError('%s: unknown Entity type' % name)
+
+def encode_registry(registry):
+    """Encode the contents of a `CategoryRegistry`."""
+    return encode_categories(registry.all())
+
+def decode_registry(data, registry):
+    """Register the categories of a message created by `encode_registry()`
+    not already present in the specified `CategoryRegistry`.
+
+    >>> from occi.core import CategoryRegistry
+    >>> from occi.ext.infrastructure import *
+    >>> source = CategoryRegistry()
+    >>> source.register(ComputeKind)
+    >>> source.register(Mixin('tag', 'http://example.com/occi/user#', userdefined=True, location='tag/'))
+    >>> registry = CategoryRegistry()
+    >>> decode_registry(encode_registry(source), registry)
+    >>> registry.lookup_id(ComputeKind) is ComputeKind
+    False
+    >>> registry.lookup_location('tag/')
+    Mixin('tag', 'http://example.com/occi/user#')
+    >>> sorted(c.id for c in registry.all()) == sorted(c.id for c in source.all())
+    True
+    >>> registry = CategoryRegistry()
+    >>> registry.register(Mixin('label', 'http://example.com/occi/user#', location='tag/'))
+    >>> decode_registry(encode_registry(source), registry)
+    Traceback (most recent call last):
+    CodecError: tag/: location path already defined
+    """
+    categories = decode_categories(data, registry)
+    # Action categories are registered along with their Kind/Mixin
+    skip = set([category.id for category in registry.all()])
+    for category in categories:
+        skip.update([action.id for action in getattr(category, 'actions', ())])
+    for category in categories:
+        if category.id not in skip:
+            try:
+                registry.register(category)
+            except Category.Invalid as e:
+                raise CodecError(e)
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
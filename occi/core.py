@@ -17,10 +17,33 @@
 # along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import copy_reg
+import hashlib
+import logging
+import threading
 import uuid
-from occi import OrderedDict
+import weakref
+from occi import OrderedDict, LRUCache
 
 class Attribute(object):
+    """OCCI attribute definition.
+
+    Attribute values are converted between the external and native
+    representation one at a time using `to_native()` and `from_native()` or a
+    column of values at a time using `to_native_many()` and
+    `from_native_many()`. The batch methods produce the same result as
+    converting each value separately.
+
+    >>> IntAttribute('a').to_native_many(['1', '2', 3])
+    [1, 2, 3]
+    >>> FloatAttribute('a').to_native_many(['1.5', 2])
+    [1.5, 2.0]
+    >>> BoolAttribute('a').to_native_many(['true', 'false'])
+    [True, False]
+    >>> IntAttribute('a').to_native_many(['1', 'x'])
+    Traceback (most recent call last):
+    Invalid: a='x': invalid attribute value
+    """
     type_name = 'string'
     class Invalid(Exception):
         def __init__(self, name, value):
@@ -41,6 +64,18 @@ class Attribute(object):
     def from_native(self, v, **kwargs):
         return v
 
+    def to_native_many(self, values, **kwargs):
+        """Convert a list of values to native format."""
+        if self.to_native.im_func is Attribute.to_native.im_func:
+            return list(values)
+        return [self.to_native(s, **kwargs) for s in values]
+
+    def from_native_many(self, values, **kwargs):
+        """Convert a list of native values to external representation."""
+        if self.from_native.im_func is Attribute.from_native.im_func:
+            return list(values)
+        return [self.from_native(v, **kwargs) for v in values]
+
     def __repr__(self):
         return "%s('%s', required=%s, mutable=%s)" % (self.__class__.__name__, self.name, self.required, self.mutable)
 
@@ -52,6 +87,13 @@ class IntAttribute(Attribute):
         except ValueError:
             raise self.Invalid(self.name, s)
 
+    def to_native_many(self, values, **kwargs):
+        try:
+            return map(int, values)
+        except ValueError:
+            # Locate (and report) the invalid value
+            return super(IntAttribute, self).to_native_many(values, **kwargs)
+
 class FloatAttribute(Attribute):
     type_name = 'float'
     def to_native(self, s, **kwargs):
@@ -60,6 +102,13 @@ class FloatAttribute(Attribute):
         except ValueError:
             raise self.Invalid(self.name, s)
 
+    def to_native_many(self, values, **kwargs):
+        try:
+            return map(float, values)
+        except (ValueError, TypeError, OverflowError):
+            # Locate (and report) the invalid value
+            return super(FloatAttribute, self).to_native_many(values, **kwargs)
+
 class BoolAttribute(Attribute):
     type_name = 'boolean'
     def to_native(self, s, **kwargs):
@@ -70,27 +119,97 @@ class BoolAttribute(Attribute):
         else:
             raise self.Invalid(self.name, s)
 
+    _values = {'true': True, 'false': False}
+
+    def to_native_many(self, values, **kwargs):
+        try:
+            return map(self._values.__getitem__, values)
+        except (KeyError, TypeError):
+            # Locate (and report) the invalid value
+            return super(BoolAttribute, self).to_native_many(values, **kwargs)
+
+# Interned UUID objects keyed by external ID strings
+_uuids = weakref.WeakValueDictionary()
+
+# Canonical string form of interned UUID objects, keyed by id(UUID)
+_uuid_strings = {}
+
+def intern_uuid(s):
+    """Return the shared `uuid.UUID` object for an ID string. Identical IDs
+    are only parsed once as long as the UUID object is in use.
+
+    >>> u = intern_uuid('urn:uuid:10000000-0000-4000-0000-000000000000')
+    >>> u is intern_uuid('10000000-0000-4000-0000-000000000000')
+    True
+    >>> uuid_str(u)
+    '10000000-0000-4000-0000-000000000000'
+    """
+    try:
+        return _uuids[s]
+    except KeyError:
+        pass
+    u = uuid.UUID(s)
+    canonical = str(u)
+    u = _uuids.setdefault(canonical, u)
+    _uuids[s] = u
+    if id(u) not in _uuid_strings:
+        _remember_uuid_str(u, canonical)
+    return u
+
+def _remember_uuid_str(u, canonical):
+    key = id(u)
+    def forget(ref):
+        if _uuid_strings.get(key, (None,))[0] is ref:
+            del _uuid_strings[key]
+    _uuid_strings[key] = (weakref.ref(u, forget), canonical)
+
+def uuid_str(u):
+    """Return the canonical string form of a UUID, i.e. `str(u)`, without
+    formatting it again for interned UUID objects.
+    """
+    try:
+        ref, s = _uuid_strings[id(u)]
+        if ref() is u:
+            return s
+    except KeyError:
+        pass
+    return str(u)
+
 class UUIDAttribute(Attribute):
     type_name = 'uuid'
     def to_native(self, s, **kwargs):
+        if isinstance(s, uuid.UUID):
+            return s
+        try:
+            return _uuids[s]
+        except (KeyError, TypeError):
+            pass
+        ext = s
         s = str(s)
         i = s.rfind('/')
         if i > -1 and i < len(s)-1:
             s = s[i+1:]
         try:
-            return uuid.UUID(s)
+            u = intern_uuid(s)
         except ValueError:
             raise self.Invalid(self.name, s)
+        if isinstance(ext, basestring):
+            _uuids[ext] = u
+        return u
 
     def from_native(self, u, **kwargs):
-        return str(u)
+        return uuid_str(u)
+
+    def from_native_many(self, values, **kwargs):
+        return map(uuid_str, values)
+
 
 class ResourceAttribute(Attribute):
     """An attribute represanting an OCCI Resource instance.
 
-    The native (internal) representation is an Resource object while the
-    external is an identifier which can be translated into an Entity ID
-    (occi.core.id).
+    The native (internal) representation is an Resource object, or an
+    `EntityRef` until resolved by the `ServerBackend`, while the external is
+    an identifier which can be translated into an Entity ID (occi.core.id).
 
     The format of the external identifier is defined by the translator.
     """
@@ -100,8 +219,41 @@ class ResourceAttribute(Attribute):
     def from_native(self, resource, translator=None, **kwargs):
         return translator.from_native(resource)
 
+def _intern(s):
+    try:
+        return intern(s)
+    except TypeError:
+        return s
+
+def _category_id(category):
+    """Return the identifier (scheme + term) of a Category instance or the
+    string representation of anything else.
+    """
+    if isinstance(category, Category):
+        return category.id
+    return str(category)
+
 class Category(object):
-    """The OCCI Category type."""
+    """The OCCI Category type.
+
+    A Category is identified by the concatenation of its scheme and term. The
+    identifier is computed once and interned, i.e. the `term` and `scheme` of
+    a Category instance must not be modified. Categories compare equal to
+    other Categories and strings with the same identifier and can be used
+    directly as keys of dictionaries and sets.
+
+    >>> cat = Category('start', 'http://example.com/occi/foo/action#')
+    >>> cat.id
+    'http://example.com/occi/foo/action#start'
+    >>> cat == Category('start', 'http://example.com/occi/foo/action#')
+    True
+    >>> cat == 'http://example.com/occi/foo/action#start'
+    True
+    >>> cat != Category('stop', 'http://example.com/occi/foo/action#')
+    True
+    >>> cat in set(['http://example.com/occi/foo/action#start'])
+    True
+    """
 
     class CategoryError(Exception):
         pass
@@ -113,91 +265,293 @@ class Category(object):
     def __init__(self, term, scheme, title=None, related=None, attributes=None, defaults=None):
         self.term = term
         self.scheme = scheme
+        self.id = _intern(scheme + term)
         self.title = title
-        self.related = related
-        self.attributes = OrderedDict()
         self.unique_attributes = OrderedDict()
-        self.defaults = defaults or OrderedDict()
+        self.defaults = OrderedDict(defaults or ())
 
         # Attribute definitions
-        if related:
-            self.attributes = related.attributes.copy()
         for attr in attributes or ():
             self.unique_attributes[attr.name] = attr
-        self.attributes.update(self.unique_attributes)
-
-        # Attribute defaults
+        self._set_related(related)
 
     def __repr__(self):
         return "%s('%s', '%s')" % (self.__class__.__name__, self.term, self.scheme)
 
     def __str__(self):
-        return self.scheme + self.term
+        return self.id
+
+    def __reduce__(self):
+        """Categories registered in a `CategoryRegistry`, and the OCCI Core
+        Kinds, are pickled by identifier and unpickled as the instance
+        registered in the receiving process. Other Categories are pickled by
+        value.
+
+        >>> import pickle
+        >>> reg = CategoryRegistry()
+        >>> tagMixin = Mixin('tag', 'http://example.com/occi#', location='tag/')
+        >>> reg.register(tagMixin)
+        >>> pickle.loads(pickle.dumps(tagMixin)) is tagMixin
+        True
+        >>> pickle.loads(pickle.dumps(ResourceKind, 2)) is ResourceKind
+        True
+        >>> fooKind = Kind('foo', 'http://example.com/occi#', related=ResourceKind, attributes=[IntAttribute('com.example.foo')])
+        >>> kind = pickle.loads(pickle.dumps(fooKind))
+        >>> kind is fooKind, kind == fooKind, kind.related is ResourceKind
+        (False, True, True)
+        >>> kind.attributes.values()
+        [UUIDAttribute('occi.core.id', required=False, mutable=False), Attribute('occi.core.title', required=False, mutable=True), Attribute('occi.core.summary', required=False, mutable=True), IntAttribute('com.example.foo', required=True, mutable=False)]
+        >>> reg.unregister(tagMixin)
+        >>> pickle.loads(pickle.dumps(tagMixin)) is tagMixin
+        False
+        """
+        if _is_registered(self):
+            return (_lookup_category, (self.id,))
+        return (copy_reg.__newobj__, (self.__class__,), self.__getstate__())
+
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.id = _intern(self.id)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        if isinstance(other, Category):
+            return self.id is other.id or self.id == other.id
+        elif isinstance(other, basestring):
+            return self.id == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def _set_related(self, related):
+        """Set the related Category and update the inherited attribute
+        definitions and the set of ancestors accordingly.
+        """
+        self.related = related
+        self.attributes = OrderedDict()
+        if related:
+            self.attributes.update(related.attributes)
+        self.attributes.update(self.unique_attributes)
 
-    def __cmp__(self, other):
-        return cmp(str(self), str(other))
+        # Identifiers of this Category and all Categories it is related to
+        self.ancestors = frozenset([self.id])
+        if related:
+            self.ancestors |= related.ancestors
 
     def is_related(self, category):
-        current = self
-        while current:
-            if category == current:
-                return True
-            current = current.related
-        return False
+        """Return whether this Category is the specified Category or is
+        related to it, directly or through its ancestors.
 
-class CategoryRegistry(object):
-    """Registry of all Category/Kind/Mixin instances currently known to the
-    OCCI server or client.
+        >>> ComputeKind = Kind('compute', 'http://schemas.ogf.org/occi/infrastructure#', related=ResourceKind)
+        >>> ComputeKind.is_related(EntityKind)
+        True
+        >>> ComputeKind.is_related(LinkKind)
+        False
+        """
+        return _category_id(category) in self.ancestors
 
-    >>> reg = CategoryRegistry()
-    >>> from occi.core import Category, ExtCategory, Kind, Mixin
-    >>> from occi.ext.infrastructure import *
-    >>> reg.register(ComputeKind)
-    >>> reg.register(StorageKind)
-    >>> reg.register(StorageLinkKind)
-    >>> fooKind = Kind('foo', 'http://#', related=ResourceKind, location='compute/')
-    >>> reg.register(fooKind)
-    Traceback (most recent call last):
-    Invalid: compute/: location path already defined
-    >>> reg.lookup_id(ComputeKind)
-    Kind('compute', 'http://schemas.ogf.org/occi/infrastructure#')
-    >>> reg.lookup_location('storage/')
-    Kind('storage', 'http://schemas.ogf.org/occi/infrastructure#')
-    >>> reg.lookup_recursive('/link/')
-    [Kind('storagelink', 'http://schemas.ogf.org/occi/infrastructure#')]
-    >>> reg.lookup_recursive('/') == reg.all()
-    True
-    >>> reg.unregister(StorageKind)
-    >>> reg.unregister(ComputeKind)
-    >>> reg.unregister(EntityKind) ; reg.unregister(ResourceKind) ; reg.unregister(LinkKind)
-    >>> reg.all()
-    [Kind('storagelink', 'http://schemas.ogf.org/occi/infrastructure#')]
+class _LocationNode(object):
+    __slots__ = ('children', 'category')
 
+    def __init__(self):
+        self.children = {}
+        self.category = None
+
+    def _copy(self):
+        node = _LocationNode()
+        node.children = self.children.copy()
+        node.category = self.category
+        return node
+
+class LocationIndex(object):
+    """Path trie mapping location paths (e.g. "link/storage/") to categories.
+
+    Supports exact, prefix (all locations below a path) and longest-prefix
+    lookups in time proportional to the depth of the path, independently of
+    the number of locations indexed. Exact lookups are served by a
+    dictionary.
+
+    >>> index = LocationIndex()
+    >>> index.insert('compute/', 'compute')
+    >>> index.insert('link/storage/', 'storagelink')
+    >>> index.insert('link/networkinterface/', 'networkinterface')
+    >>> index.lookup('compute/')
+    'compute'
+    >>> index.lookup('compute')
+    >>> index.lookup('link/')
+    >>> sorted(index.lookup_prefix('link/'))
+    ['networkinterface', 'storagelink']
+    >>> index.lookup_longest('link/storage/10000000-0000-4000-0000-000000000000')
+    'storagelink'
+    >>> old = index.copy()
+    >>> index.remove('link/storage/')
+    >>> index.lookup_prefix('link/')
+    ['networkinterface']
+    >>> index.lookup_longest('link/storage/10000000-0000-4000-0000-000000000000')
+    >>> sorted(old.lookup_prefix('link/'))
+    ['networkinterface', 'storagelink']
     """
 
     def __init__(self):
-        self._categories = OrderedDict()
-        self._locations = {}
+        self._root = _LocationNode()
+        self._exact = {}
+
+    def __len__(self):
+        return len(self._exact)
+
+    def _segments(self, path):
+        return [s for s in path.split('/') if s]
+
+    def _find(self, segments):
+        node = self._root
+        for s in segments:
+            node = node.children.get(s)
+            if node is None:
+                break
+        return node
+
+    def copy(self):
+        """Return a copy of the index. Nodes are shared between the copies,
+        insert() and remove() copy the nodes along the modified path only.
+        """
+        index = LocationIndex.__new__(LocationIndex)
+        index._root = self._root
+        index._exact = self._exact.copy()
+        return index
+
+    def insert(self, location, category):
+        """Add category at location path, replacing any existing entry."""
+        segments = self._segments(location)
+        node = self._root = self._root._copy()
+        for s in segments:
+            child = node.children.get(s)
+            child = child._copy() if child is not None else _LocationNode()
+            node.children[s] = child
+            node = child
+        node.category = category
+        self._exact['/'.join(segments) + '/'] = category
+
+    def remove(self, location):
+        """Remove the entry at location path, if any, and prune empty
+        nodes.
+        """
+        segments = self._segments(location)
+        key = '/'.join(segments) + '/'
+        if key not in self._exact:
+            return
+        del self._exact[key]
+        path = [self._root._copy()]
+        for s in segments:
+            node = path[-1].children[s]._copy()
+            path[-1].children[s] = node
+            path.append(node)
+        self._root = path[0]
+        path[-1].category = None
+        for s in reversed(segments):
+            node = path.pop()
+            if node.children or node.category is not None:
+                break
+            del path[-1].children[s]
+
+    def lookup(self, location):
+        """Return the category registered at exactly the location path. A
+        location path always ends with a slash.
+        """
+        return self._exact.get(location)
 
-        # Always register OCCI Core types
-        self.register(EntityKind)
-        self.register(ResourceKind)
-        self.register(LinkKind)
+    def lookup_prefix(self, path):
+        """Return all categories registered at or below path."""
+        node = self._find(self._segments(path))
+        categories = []
+        stack = []
+        if node is not None:
+            stack.append(node)
+        while stack:
+            node = stack.pop()
+            if node.category is not None:
+                categories.append(node.category)
+            stack.extend(node.children.itervalues())
+        return categories
 
-    def register(self, category):
-        """Register a new Category/Kind/Mixin."""
-        s = str(category)
+    def lookup_longest(self, path):
+        """Return the category with the longest location path being a prefix of
+        the specified path.
+        """
+        node = self._root
+        category = None
+        for s in self._segments(path):
+            node = node.children.get(s)
+            if node is None:
+                break
+            if node.category is not None:
+                category = node.category
+        return category
+
+class RegistrySnapshot(object):
+    """Immutable view of the contents of a `CategoryRegistry`.
+
+    A snapshot is never modified once published by the registry, i.e. a
+    reader holding a snapshot sees a consistent set of categories without any
+    locking. Each published snapshot has a generation number one higher than
+    the previous one.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._categories = OrderedDict()
+        self._locations = LocationIndex()
+        self._descendants = {}
+
+    def _copy(self):
+        """Return an unpublished copy of the snapshot for modification."""
+        snapshot = RegistrySnapshot.__new__(RegistrySnapshot)
+        snapshot.generation = self.generation + 1
+        snapshot._categories = self._categories.copy()
+        snapshot._locations = self._locations.copy()
+        snapshot._descendants = self._descendants.copy()
+        return snapshot
+
+    def _register(self, category, changes, rebind):
+        """Register the category in this unpublished snapshot. Categories to
+        be bound to the registered instance of their related category are
+        appended to `rebind`, see `_rebind()`. The category itself is not
+        modified.
+        """
+        s = category.id
         if s in self._categories:
             raise Category.Invalid('%s: Category already registered' % s)
 
+        # Bind related category to the registered instance, if any
+        related = category.related
+        ancestors = category.ancestors
+        if related is not None and related.id in self._categories:
+            registered = self._categories[related.id]
+            if not isinstance(registered, related.__class__):
+                raise Category.Invalid('%s: invalid related category %s' % (category, related))
+            if registered is not related:
+                rebind.append((category, registered))
+                ancestors = frozenset([s]) | registered.ancestors
+
         # Location
         if hasattr(category, 'location') and category.location:
-            if category.location in self._locations:
+            if self._locations.lookup(category.location) is not None:
                 raise Category.Invalid('%s: location path already defined' % category.location)
-            self._locations[category.location] = category
+            self._locations.insert(category.location, category)
 
         # Register category
         self._categories[s] = category
+        changes.append(category)
+        for ancestor in ancestors:
+            self._descendants[ancestor] = self._descendants.get(ancestor, ()) + (category,)
 
         # Register actions
         if hasattr(category, 'actions'):
@@ -205,36 +559,67 @@ class CategoryRegistry(object):
                 if hasattr(action, 'actions'):
                     raise Category.Invalid(
                             '%s: Only the base Category type allowed to identify Actions' % action)
-                self.register(action)
+                self._register(action, changes, rebind)
 
-    def unregister(self, category):
-        """Unregister a previously registered Category/Kind/Mixin."""
+    def _rebind(self, rebind):
+        """Bind categories to the registered instance of their related
+        category once registration has been validated. Cached
+        `EntitySchema`s built from the old definitions are dropped.
+        """
+        for category, registered in rebind:
+            category._set_related(registered)
+            if isinstance(category, Kind):
+                category._entity_schemas.clear()
+            else:
+                for kind in self._categories.itervalues():
+                    if isinstance(kind, Kind):
+                        kind._entity_schemas.clear()
+
+    def _unregister(self, category, changes):
         try:
-            category = self._categories[str(category)]
+            category = self._categories[_category_id(category)]
         except KeyError:
             raise Category.Invalid("%s: Category not registered" % category)
 
         # Unregister category
-        del self._categories[str(category)]
+        del self._categories[category.id]
+        changes.append(category)
+        for ancestor in category.ancestors:
+            self._descendants[ancestor] = tuple(
+                    [c for c in self._descendants[ancestor] if c is not category])
 
         # Remove location entry
         if hasattr(category, 'location') and category.location:
-            self._locations.pop(category.location, None)
+            self._locations.remove(category.location)
 
         # Remove additional action categories
         if hasattr(category, 'actions'):
             for action in category.actions:
-                self.unregister(action)
+                self._unregister(action, changes)
 
     def lookup_id(self, identifier):
         try:
-            return self._categories[str(identifier)]
+            return self._categories[_category_id(identifier)]
         except KeyError:
             raise Category.DoesNotExist('"%s": Category does not exist' % identifier)
 
     def lookup_location(self, path):
-        loc = path.lstrip('/')
-        return self._locations.get(loc)
+        """Find the category registered at exactly the specified location
+        path.
+        """
+        return self._locations.lookup(path.lstrip('/'))
+
+    def lookup_location_prefix(self, path):
+        """Find the category with the longest location path being a prefix of
+        the specified path, e.g. the Kind of an Entity location.
+        """
+        return self._locations.lookup_longest(path.lstrip('/'))
+
+    def lookup_descendants(self, category):
+        """Return all registered categories related to the specified Category,
+        including the Category itself if registered.
+        """
+        return list(self._descendants.get(_category_id(category), ()))
 
     def lookup_recursive(self, path):
         """Find all categories registered at a location below the specified
@@ -243,15 +628,228 @@ class CategoryRegistry(object):
         loc = path.lstrip('/')
         if not loc:
             return self.all()
-        categories = []
-        for location, category in self._locations.iteritems():
-            if location.startswith(loc):
-                categories.append(category)
-        return categories
+        return self._locations.lookup_prefix(loc)
 
     def all(self):
         return self._categories.values()
 
+# Live CategoryRegistry instances, used to re-bind unpickled Categories
+_registries = weakref.WeakSet()
+
+def _is_registered(category):
+    """Return whether the Category instance is an OCCI Core Kind or
+    registered in any live `CategoryRegistry`.
+    """
+    if _core_categories.get(category.id) is category:
+        return True
+    for registry in list(_registries):
+        try:
+            if registry.lookup_id(category.id) is category:
+                return True
+        except Category.DoesNotExist:
+            pass
+    return False
+
+def _lookup_category(category_id):
+    """Return the Category instance registered under the identifier in any
+    live `CategoryRegistry`. Used when unpickling Categories.
+    """
+    for registry in list(_registries):
+        try:
+            return registry.lookup_id(category_id)
+        except Category.DoesNotExist:
+            pass
+    try:
+        return _core_categories[category_id]
+    except KeyError:
+        raise Category.DoesNotExist('"%s": Category does not exist' % category_id)
+
+class CategoryRegistry(object):
+    """Registry of all Category/Kind/Mixin instances currently known to the
+    OCCI server or client.
+
+    The registry contents are published as immutable `RegistrySnapshot`s.
+    Lookups never block, while `register()` and `unregister()` are
+    serialised and replace the current snapshot atomically.
+
+    Each change increments the registry `generation`. Listeners added using
+    `subscribe()` are called as `listener(event, category, generation)` for
+    every Category registered or unregistered, including the Action
+    categories of a Kind/Mixin.
+
+    >>> reg = CategoryRegistry()
+    >>> from occi.core import Category, ExtCategory, Kind, Mixin
+    >>> from occi.ext.infrastructure import *
+    >>> reg.register(ComputeKind)
+    >>> reg.register(StorageKind)
+    >>> reg.register(StorageLinkKind)
+    >>> fooKind = Kind('foo', 'http://#', related=ResourceKind, location='compute/')
+    >>> reg.register(fooKind)
+    Traceback (most recent call last):
+    Invalid: compute/: location path already defined
+    >>> reg.lookup_id(ComputeKind)
+    Kind('compute', 'http://schemas.ogf.org/occi/infrastructure#')
+    >>> reg.lookup_location('storage/')
+    Kind('storage', 'http://schemas.ogf.org/occi/infrastructure#')
+    >>> reg.lookup_location_prefix('/link/storage/10000000-0000-4000-0000-000000000000')
+    Kind('storagelink', 'http://schemas.ogf.org/occi/infrastructure#')
+    >>> reg.lookup_recursive('/link/')
+    [Kind('storagelink', 'http://schemas.ogf.org/occi/infrastructure#')]
+    >>> reg.lookup_recursive('/') == reg.all()
+    True
+    >>> reg.lookup_descendants(LinkKind)
+    [Kind('link', 'http://schemas.ogf.org/occi/core#'), Kind('storagelink', 'http://schemas.ogf.org/occi/infrastructure#')]
+    >>> snapshot = reg.snapshot()
+    >>> reg.register(IPNetworkMixin)
+    >>> tagMixin = Mixin('tag', 'http://example.com/occi#', related=Mixin('ipnetwork', 'http://schemas.ogf.org/occi/infrastructure/network#'))
+    >>> reg.register(tagMixin)
+    >>> tagMixin.related is IPNetworkMixin
+    True
+    >>> tagMixin.attributes.keys()
+    ['occi.network.address', 'occi.network.gateway', 'occi.network.allocation']
+    >>> reg.lookup_descendants(IPNetworkMixin)
+    [Mixin('ipnetwork', 'http://schemas.ogf.org/occi/infrastructure/network#'), Mixin('tag', 'http://example.com/occi#')]
+    >>> snapshot.lookup_descendants(IPNetworkMixin)
+    []
+    >>> reg.generation - snapshot.generation
+    2
+    >>> barMixin = Mixin('bar', 'http://example.com/occi#', related=Mixin('ipnetwork', 'http://schemas.ogf.org/occi/infrastructure/network#'), location='storage/')
+    >>> reg.register(barMixin)
+    Traceback (most recent call last):
+    Invalid: storage/: location path already defined
+    >>> barMixin.related is IPNetworkMixin
+    False
+    >>> barKind = Kind('bar', 'http://example.com/occi#', related=Kind('storage', 'http://schemas.ogf.org/occi/infrastructure#'))
+    >>> 'occi.storage.size' in EntitySchema.get(barKind).by_name
+    False
+    >>> reg.register(barKind)
+    >>> 'occi.storage.size' in EntitySchema.get(barKind).by_name
+    True
+    >>> reg.unregister(barKind)
+    >>> def listener(event, category, generation):
+    ...     print event, category
+    >>> reg.subscribe(listener)
+    >>> reg.register(NetworkKind)
+    register http://schemas.ogf.org/occi/infrastructure#network
+    register http://schemas.ogf.org/occi/infrastructure/network/action#up
+    register http://schemas.ogf.org/occi/infrastructure/network/action#down
+    >>> reg.unregister(NetworkKind)
+    unregister http://schemas.ogf.org/occi/infrastructure#network
+    unregister http://schemas.ogf.org/occi/infrastructure/network/action#up
+    unregister http://schemas.ogf.org/occi/infrastructure/network/action#down
+    >>> reg.unsubscribe(listener)
+    >>> def failing_listener(event, category, generation):
+    ...     raise RuntimeError('listener failed')
+    >>> events = []
+    >>> def counting_listener(event, category, generation):
+    ...     events.append(event)
+    >>> reg.subscribe(failing_listener) ; reg.subscribe(counting_listener)
+    >>> import logging ; logging.disable(logging.ERROR)
+    >>> reg.register(NetworkKind)
+    >>> logging.disable(logging.NOTSET)
+    >>> reg.lookup_id(NetworkKind) is NetworkKind, events
+    (True, ['register', 'register', 'register'])
+    >>> reg.unsubscribe(failing_listener) ; reg.unsubscribe(counting_listener)
+    >>> reg.unregister(NetworkKind)
+    >>> reg.unregister(tagMixin) ; reg.unregister(IPNetworkMixin)
+    >>> reg.unregister(StorageKind)
+    >>> reg.unregister(ComputeKind)
+    >>> reg.unregister(EntityKind) ; reg.unregister(ResourceKind) ; reg.unregister(LinkKind)
+    >>> reg.all()
+    [Kind('storagelink', 'http://schemas.ogf.org/occi/infrastructure#')]
+
+    """
+
+    REGISTER = 'register'
+    UNREGISTER = 'unregister'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = RegistrySnapshot()
+        self._listeners = ()
+        _registries.add(self)
+
+        # Always register OCCI Core types
+        self.register(EntityKind)
+        self.register(ResourceKind)
+        self.register(LinkKind)
+
+    @property
+    def generation(self):
+        """Generation number of the current snapshot, incremented on every
+        change to the set of registered categories.
+        """
+        return self._snapshot.generation
+
+    def snapshot(self):
+        """Return the current `RegistrySnapshot`."""
+        return self._snapshot
+
+    def subscribe(self, listener):
+        """Call `listener(event, category, generation)` on every registry
+        change. `event` is either `REGISTER` or `UNREGISTER`. An exception
+        raised by a listener is logged and does not affect the registry
+        change nor the other listeners.
+        """
+        with self._lock:
+            self._listeners += (listener,)
+
+    def unsubscribe(self, listener):
+        """Remove a listener previously added by `subscribe()`."""
+        with self._lock:
+            listeners = list(self._listeners)
+            listeners.remove(listener)
+            self._listeners = tuple(listeners)
+
+    def register(self, category):
+        """Register a new Category/Kind/Mixin."""
+        changes = []
+        rebind = []
+        with self._lock:
+            snapshot = self._snapshot._copy()
+            snapshot._register(category, changes, rebind)
+            snapshot._rebind(rebind)
+            self._snapshot = snapshot
+        self._notify(self.REGISTER, changes, snapshot.generation)
+
+    def unregister(self, category):
+        """Unregister a previously registered Category/Kind/Mixin."""
+        changes = []
+        with self._lock:
+            snapshot = self._snapshot._copy()
+            snapshot._unregister(category, changes)
+            self._snapshot = snapshot
+        self._notify(self.UNREGISTER, changes, snapshot.generation)
+
+    def _notify(self, event, categories, generation):
+        # Listeners are called outside the lock, allowing them to look up
+        # (or modify) the registry.
+        for listener in self._listeners:
+            for category in categories:
+                try:
+                    listener(event, category, generation)
+                except Exception:
+                    logging.exception('%s: %s listener failed for %s',
+                            listener, event, category)
+
+    def lookup_id(self, identifier):
+        return self._snapshot.lookup_id(identifier)
+
+    def lookup_location(self, path):
+        return self._snapshot.lookup_location(path)
+
+    def lookup_location_prefix(self, path):
+        return self._snapshot.lookup_location_prefix(path)
+
+    def lookup_descendants(self, category):
+        return self._snapshot.lookup_descendants(category)
+
+    def lookup_recursive(self, path):
+        return self._snapshot.lookup_recursive(path)
+
+    def all(self):
+        return self._snapshot.all()
+
 class ExtCategory(Category):
     def __init__(self, term, scheme, actions=None, location=None, **kwargs):
         super(ExtCategory, self).__init__(term, scheme, **kwargs)
@@ -273,6 +871,9 @@ class ExtCategory(Category):
         self._location = loc
     location = property(get_location, set_location)
 
+# Number of Mixin combinations for which the EntitySchema is cached per Kind
+SCHEMA_CACHE_SIZE = 64
+
 class Kind(ExtCategory):
     """The OCCI Kind type.
 
@@ -281,10 +882,21 @@ class Kind(ExtCategory):
     def __init__(self, term, scheme, entity_type=None, **kwargs):
         super(Kind, self).__init__(term, scheme, **kwargs)
         self.entity_type = entity_type or Entity
+        self._entity_schemas = LRUCache(SCHEMA_CACHE_SIZE)
 
         if self.related and not isinstance(self.related, Kind):
             raise Category.Invalid("Kind instance can only be related to other Kind instances")
 
+    def __getstate__(self):
+        # The EntitySchema cache is rebuilt on demand
+        state = self.__dict__.copy()
+        del state['_entity_schemas']
+        return state
+
+    def __setstate__(self, state):
+        super(Kind, self).__setstate__(state)
+        self._entity_schemas = LRUCache(SCHEMA_CACHE_SIZE)
+
 class Mixin(ExtCategory):
     """The OCCI Mixin type.
 
@@ -373,6 +985,18 @@ class Action(object):
         if param_dict:
             raise self.UnknownParameter(param_dict.keys()[0])
 
+    def __reduce__(self):
+        """The parameters are pickled in native format, the defining Category
+        by identifier if registered.
+
+        >>> import pickle
+        >>> startAction = Category('start', 'http://example.com/occi/foo/action#', attributes=[BoolAttribute('example.com.force')])
+        >>> action = pickle.loads(pickle.dumps(Action(startAction, parameters=[('example.com.force', 'true')])))
+        >>> action.category == startAction, action.parameters
+        (True, [('example.com.force', True)])
+        """
+        return (_restore_action, (self._occi_category, self._occi_parameters))
+
     def _get_occi_category(self):
         return self._occi_category
     category = property(_get_occi_category)
@@ -387,6 +1011,12 @@ class Action(object):
         return params
     parameters = property(_get_occi_parameters)
 
+def _restore_action(category, parameters):
+    action = Action.__new__(Action)
+    action._occi_category = category
+    action._occi_parameters = parameters
+    return action
+
 class EntityTranslator(object):
     """Translate Entity between native (internal) and external representation.
 
@@ -395,14 +1025,276 @@ class EntityTranslator(object):
 
     The OCCI Http Rendering provides an URL translator suitable for mapping
     URLs to Entity IDs. See occi.http.dataobject.URLTranslator.
+
+    The native representation returned by to_native() is an `EntityRef`.
     """
     def to_native(self, ext, **kwargs):
-        entity = Entity(EntityKind)
-        entity.occi_import_attributes([('occi.core.id', ext)], validate=False)
-        return entity
+        return EntityRef(ext)
     def from_native(self, entity, **kwargs):
         return entity.id
 
+class EntityRef(object):
+    """Reference to an Entity instance by ID, optionally with a hint of its
+    Kind. Used where only the ID of an Entity instance is known, e.g. the
+    source and target of a Link submitted by a client. A `ServerBackend`
+    resolves the reference into the Entity instance when needed.
+
+    >>> ref = EntityRef('urn:uuid:10000000-0000-4000-0000-000000000000')
+    >>> ref
+    EntityRef(UUID('10000000-0000-4000-0000-000000000000'))
+    >>> ref.occi_get_kind()
+    Kind('entity', 'http://schemas.ogf.org/occi/core#')
+    >>> ref.resolve()
+
+    A reference created by `for_entity()` keeps a weak reference to the Entity
+    instance. Links refer to their source and target this way in order not to
+    create reference cycles between Resources and Links.
+
+    >>> entity = Entity(ResourceKind)
+    >>> entity.occi_set_attribute('occi.core.id', ref.id)
+    >>> ref = EntityRef.for_entity(entity)
+    >>> ref.resolve() is entity, ref.kind
+    (True, Kind('resource', 'http://schemas.ogf.org/occi/core#'))
+    >>> del entity
+    >>> ref.resolve()
+    """
+    __slots__ = ('id', 'kind', '_ref')
+
+    def __init__(self, entity_id, kind=None):
+        self.id = EntityKind.attributes['occi.core.id'].to_native(entity_id)
+        self.kind = kind
+        self._ref = None
+
+    @classmethod
+    def for_entity(cls, entity):
+        """Return a reference to an Entity instance."""
+        ref = cls.__new__(cls)
+        ref.id = entity.id
+        ref.kind = entity.occi_get_kind()
+        ref._ref = weakref.ref(entity)
+        return ref
+
+    def resolve(self):
+        """Return the referenced Entity instance if known and still alive,
+        otherwise None.
+        """
+        if self._ref is not None:
+            return self._ref()
+        return None
+
+    def occi_get_kind(self):
+        return self.kind or EntityKind
+
+    def occi_list_categories(self):
+        return [self.occi_get_kind()]
+
+    def __reduce__(self):
+        # The weak reference to the Entity instance is not pickled
+        return (EntityRef, (self.id, self.kind))
+
+    def __repr__(self):
+        return 'EntityRef(%r)' % self.id
+
+# Translator used by Entity instances unless another one is set
+_default_translator = EntityTranslator()
+
+# Marker for attribute values not set in an Entity instance
+_UNSET = object()
+
+class _Raw(object):
+    """Attribute value in external representation, imported but not yet
+    converted to native format.
+    """
+    __slots__ = ('value', 'translator')
+
+    def __init__(self, value, translator):
+        self.value = value
+        self.translator = translator
+
+def _from_native(attribute, value, translator):
+    """Convert value to external representation, short-circuiting raw
+    values imported using the same translator.
+    """
+    if value.__class__ is _Raw:
+        if value.translator is translator:
+            return value.value
+        value = attribute.to_native(value.value, translator=value.translator)
+    return attribute.from_native(value, translator=translator)
+
+def _is_default(value, default):
+    """Return whether value equals the default value."""
+    return default is not _UNSET and (value is default or
+            (type(value) is type(default) and value == default))
+
+class EntitySchema(object):
+    """The attribute layout of a resource instance, i.e. the combined attribute
+    definitions of its Kind and Mixins.
+
+    The attribute values of an Entity instance are stored in a list where the
+    position of each value is given by the `EntitySchema`. A schema is shared
+    by all resource instances of the same Kind and set of Mixins.
+
+    >>> fooMixin = Mixin('foo', 'http://example.com/occi#', attributes=[Attribute('com.example.foo')])
+    >>> barMixin = Mixin('bar', 'http://example.com/occi#')
+    >>> schema = EntitySchema.get(ResourceKind, [fooMixin, barMixin])
+    >>> [attribute.name for attribute in schema.attributes]
+    ['occi.core.id', 'occi.core.title', 'occi.core.summary', 'com.example.foo']
+    >>> schema.index['com.example.foo']
+    3
+    >>> schema.by_name['occi.core.id']
+    UUIDAttribute('occi.core.id', required=False, mutable=False)
+    >>> sorted(schema.required)
+    ['com.example.foo']
+    >>> sorted(schema.mutable)
+    ['occi.core.summary', 'occi.core.title']
+    >>> EntitySchema.get(ResourceKind, [barMixin, fooMixin]) is schema
+    True
+
+    Schemas are cached by the Kind, keyed by the Mixin identifiers. A new
+    Mixin instance replacing one with the same identifier gets a new schema.
+
+    >>> fooMixin2 = Mixin('foo', 'http://example.com/occi#')
+    >>> schema = EntitySchema.get(ResourceKind, [fooMixin2, barMixin])
+    >>> [attribute.name for attribute in schema.attributes]
+    ['occi.core.id', 'occi.core.title', 'occi.core.summary']
+
+    The attribute defaults (native values) of the Kind, the Mixins and the
+    Categories they are related to are merged into a single table. Defaults
+    of a Mixin override those of the Kind and defaults of a Category override
+    those of the Category it is related to. Since schemas are cached, the
+    `defaults` of a Category must not be modified once resource instances
+    have been created.
+
+    >>> bazMixin = Mixin('baz', 'http://example.com/occi#', related=fooMixin, defaults={'com.example.foo': 'baz'})
+    >>> schema = EntitySchema.get(ResourceKind, [bazMixin])
+    >>> schema.defaults[schema.index['com.example.foo']]
+    'baz'
+
+    The Actions available are indexed by bit positions used in the bitmask
+    of applicable Actions of an Entity.
+
+    >>> schema = EntitySchema.get(Kind('foo', 'http://example.com/occi#', related=ResourceKind, actions=[Category('start', 'http://example.com/occi/foo/action#'), Category('stop', 'http://example.com/occi/foo/action#')]))
+    >>> schema.action_bits['http://example.com/occi/foo/action#stop']
+    2
+    >>> list(schema.iter_actions(3))
+    [Category('start', 'http://example.com/occi/foo/action#'), Category('stop', 'http://example.com/occi/foo/action#')]
+    """
+    __slots__ = ('categories', 'attributes', 'index', 'by_name',
+            'required', 'mutable', 'actions', 'action_list', 'action_bits',
+            'defaults')
+
+    def __init__(self, categories):
+        self.categories = tuple(categories)
+        self.index = {}
+        self.by_name = {}
+        self.actions = OrderedDict()
+        attributes = []
+        defaults = {}
+        for category in self.categories:
+            for attribute in category.attributes.itervalues():
+                if attribute.name not in self.index:
+                    self.index[attribute.name] = len(attributes)
+                    self.by_name[attribute.name] = attribute
+                    attributes.append(attribute)
+            for action in category.actions:
+                self.actions[action.id] = action
+
+            # Attribute defaults, starting with the least specific Category
+            chain = []
+            c = category
+            while c is not None:
+                chain.insert(0, c)
+                c = c.related
+            for c in chain:
+                defaults.update(c.defaults)
+        self.attributes = tuple(attributes)
+        self.defaults = tuple([defaults.get(a.name, _UNSET) for a in attributes])
+        self.required = frozenset([a.name for a in attributes if a.required])
+        self.mutable = frozenset([a.name for a in attributes if a.mutable])
+
+        # Actions are identified by a bit in the applicable actions bitmask
+        self.action_list = tuple(self.actions.itervalues())
+        self.action_bits = dict([(cat_id, 1 << i)
+            for i, cat_id in enumerate(self.actions)])
+
+    def iter_actions(self, mask):
+        """Yield the actions identified by the bits set in mask."""
+        i = 0
+        while mask:
+            if mask & 1:
+                yield self.action_list[i]
+            mask >>= 1
+            i += 1
+
+    @classmethod
+    def get(cls, kind, mixins=()):
+        """Return the shared `EntitySchema` for the given Kind and set of
+        Mixins. The most recently used schemas are cached by the Kind
+        instance.
+        """
+        key = frozenset([mixin.id for mixin in mixins])
+        schema = kind._entity_schemas.get(key)
+        if schema is None or not schema._has_mixins(mixins):
+            schema = cls([kind] + list(mixins))
+            kind._entity_schemas.put(key, schema)
+        return schema
+
+    def _has_mixins(self, mixins):
+        """Return whether the schema was built from these Mixin instances,
+        not just Mixins having the same identifiers.
+        """
+        for mixin in mixins:
+            for category in self.categories:
+                if category is mixin:
+                    break
+            else:
+                return False
+        return True
+
+class EntityChanges(object):
+    """Changes made to a resource instance since it was loaded or saved, see
+    `Entity.occi_get_changes()`.
+
+    :ivar entity: The modified `Entity` instance.
+    :ivar attributes: List of modified attributes as (name, native value)
+        tuples. The value is None for attributes no longer set.
+    :ivar mixins_added: List of `Mixin` instances added.
+    :ivar mixins_removed: List of `Mixin` instances removed.
+    :ivar actions: List of (action category ID, applicable) tuples.
+    """
+    __slots__ = ('entity', 'attributes', 'mixins_added', 'mixins_removed',
+            'actions')
+
+    def __init__(self, entity, attributes=(), mixins_added=(),
+            mixins_removed=(), actions=()):
+        self.entity = entity
+        self.attributes = list(attributes)
+        self.mixins_added = list(mixins_added)
+        self.mixins_removed = list(mixins_removed)
+        self.actions = list(actions)
+
+    def apply_to(self, entity):
+        """Apply the changes to another instance of the same resource, e.g. the
+        instance stored by a `ServerBackend`.
+        """
+        for mixin in self.mixins_removed:
+            entity.occi_remove_mixin(mixin)
+        for mixin in self.mixins_added:
+            entity.occi_add_mixin(mixin)
+        for name, value in self.attributes:
+            entity.occi_set_attribute(name, value)
+        for cat_id, applicable in self.actions:
+            entity.occi_set_applicable_action(cat_id, applicable)
+
+class _ChangeSet(object):
+    """Modification log of a resource instance."""
+    __slots__ = ('attributes', 'mixins', 'actions')
+
+    def __init__(self):
+        self.attributes = set()
+        self.mixins = {}
+        self.actions = set()
+
 class Entity(object):
     """The OCCI Entity (abstract) type.
 
@@ -411,7 +1303,42 @@ class Entity(object):
     Kind instance.
 
     A "resource instance" is an instance of a sub-type of Entity.
+
+    The attribute values are kept in a list laid out by the `EntitySchema` of
+    the Kind and Mixins. Sub-types SHOULD define `__slots__` in order to keep
+    the memory footprint of each resource instance small. State kept in the
+    instance dictionary of a sub-type is copied shallowly by `occi_clone()`.
+
+    Attributes not set in the resource instance take the default value
+    defined by the Kind or Mixins. The default values are not stored in the
+    resource instance.
+
+    >>> fooKind = Kind('foo', 'http://example.com/occi#', related=ResourceKind, attributes=[Attribute('com.example.state')], defaults={'com.example.state': 'inactive'})
+    >>> entity = Entity(fooKind)
+    >>> entity.occi_get_attribute('com.example.state')
+    'inactive'
+    >>> entity.occi_import_attributes([('occi.core.title', 'Foo')])
+    >>> entity.occi_export_attributes()
+    [('occi.core.title', 'Foo'), ('com.example.state', 'inactive')]
+    >>> entity.occi_set_attribute('com.example.state', 'active')
+    >>> entity.occi_get_attribute('com.example.state')
+    'active'
+
+    A value set explicitly is kept apart from the default value, also if they
+    are equal. A required, immutable attribute can only be set once.
+
+    >>> barKind = Kind('bar', 'http://example.com/occi#', related=ResourceKind, attributes=[Attribute('com.example.owner', required=True, mutable=False)], defaults={'com.example.owner': 'nobody'})
+    >>> entity = Entity(barKind)
+    >>> entity.occi_import_attributes([('com.example.owner', 'nobody')])
+    >>> entity.occi_import_attributes([('com.example.owner', 'root')])
+    Traceback (most recent call last):
+    ImmutableAttribute: "com.example.owner": Immutable attribute
     """
+    __slots__ = ('_occi_kind', '_occi_mixins', '_occi_schema', '_occi_values',
+            '_occi_actions_applicable', '_occi_translator',
+            '_occi_version', '_occi_fingerprint', '_occi_changes', '_occi_cow',
+            '_occi_extra',
+            '__weakref__')
 
     class EntityError(Exception):
         def __init__(self, item=None, message=None):
@@ -445,17 +1372,21 @@ class Entity(object):
 
     def __init__(self, kind, mixins=[]):
         self._occi_kind = None
-        self._occi_mixins = {}
-        self._occi_attributes = {}
-        self._occi_actions_available = {}
-        self._occi_actions_applicable = {}
-        self._occi_translator = EntityTranslator()
+        self._occi_mixins = ()
+        self._occi_actions_applicable = 0
+        self._occi_translator = _default_translator
+        self._occi_version = 0
+        self._occi_fingerprint = None
+        self._occi_changes = None
+        self._occi_cow = False
+        self._occi_extra = None
 
         # Set the Kind of this resource instance
         if not kind or not isinstance(kind, Kind) or not kind.is_related(EntityKind):
             raise self.InvalidCategory(kind, 'not a valid Kind instance')
         self._occi_kind = kind
-        self._add_actions_available(kind.actions)
+        self._occi_schema = EntitySchema.get(kind)
+        self._occi_values = [_UNSET] * len(self._occi_schema.attributes)
 
         # Add additional Mixins
         for mixin in mixins:
@@ -465,59 +1396,414 @@ class Entity(object):
         return self.occi_get_attribute('occi.core.id')
     id = property(_occi_get_id)
 
-    def _add_actions_available(self, actions=[]):
-        for category in actions:
-            cat_id = str(category)
-            self._occi_actions_available[cat_id] = category
+    def occi_get_version(self):
+        """Return the version of the resource instance. The version is
+        increased whenever attributes, Mixins, applicable Actions or links of
+        the resource instance are modified.
+
+        >>> entity = Entity(EntityKind)
+        >>> version = entity.occi_get_version()
+        >>> entity.occi_set_attribute('occi.core.title', 'A title')
+        >>> entity.occi_get_version() - version
+        1
+        """
+        return self._occi_version
 
-    def _remove_actions_available(self, actions=[]):
-        for category in actions:
-            cat_id = str(category)
-            self._occi_actions_available.pop(cat_id, None)
-            self._occi_actions_applicable.pop(cat_id, None)
+    def occi_get_fingerprint(self):
+        """Return a stable hash of the Kind, Mixins, attributes and applicable
+        Actions of the resource instance. The fingerprint is cached until the
+        resource instance is modified.
+
+        >>> entity = Entity(EntityKind)
+        >>> entity.occi_set_attribute('occi.core.title', 'A title')
+        >>> fingerprint = entity.occi_get_fingerprint()
+        >>> entity.occi_get_fingerprint() is fingerprint
+        True
+        >>> entity.occi_set_attribute('occi.core.title', 'Another title')
+        >>> entity.occi_get_fingerprint() == fingerprint
+        False
+        >>> entity.occi_set_attribute('occi.core.title', 'A title')
+        >>> entity.occi_get_fingerprint() == fingerprint
+        True
+        """
+        version = self.occi_get_version()
+        if self._occi_fingerprint is None or self._occi_fingerprint[0] != version:
+            h = hashlib.sha1()
+            for part in self._occi_fingerprint_parts():
+                h.update(repr(part))
+                h.update('\n')
+            self._occi_fingerprint = (version, h.hexdigest())
+        return self._occi_fingerprint[1]
+
+    def occi_clone(self):
+        """Return a copy of the resource instance. The copy shares the
+        attribute values (and links) with the original resource instance
+        until either of them is modified.
+
+        >>> entity = Entity(EntityKind)
+        >>> entity.occi_set_attribute('occi.core.title', 'Original')
+        >>> clone = entity.occi_clone()
+        >>> clone.occi_get_attribute('occi.core.title')
+        'Original'
+        >>> clone.occi_set_attribute('occi.core.title', 'Clone')
+        >>> entity.occi_get_attribute('occi.core.title')
+        'Original'
+        >>> clone.occi_get_fingerprint() == entity.occi_get_fingerprint()
+        False
+
+        The instance dictionary of a sub-type without `__slots__` is copied
+        shallowly.
+
+        >>> class Extended(Resource):
+        ...     pass
+        >>> entity = Extended(ResourceKind)
+        >>> entity.extra = 'data'
+        >>> entity.occi_clone().extra
+        'data'
+        """
+        clone = self.__class__.__new__(self.__class__)
+        for cls in self.__class__.__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                try:
+                    setattr(clone, name, getattr(self, name))
+                except AttributeError:
+                    pass
+        if hasattr(self, '__dict__'):
+            clone.__dict__.update(self.__dict__)
+        if self._occi_extra:
+            clone._occi_extra = dict(self._occi_extra)
+        if self._occi_changes is not None:
+            changes = _ChangeSet()
+            changes.attributes.update(self._occi_changes.attributes)
+            changes.mixins.update(self._occi_changes.mixins)
+            changes.actions.update(self._occi_changes.actions)
+            clone._occi_changes = changes
+        self._occi_cow = clone._occi_cow = True
+        return clone
+
+    def _occi_unshare(self):
+        """Take a private copy of storage shared with a clone."""
+        if self._occi_cow:
+            self._occi_values = list(self._occi_values)
+            self._occi_cow = False
+
+    def _occi_track(self):
+        if self._occi_changes is None:
+            self._occi_changes = _ChangeSet()
+        return self._occi_changes
+
+    def occi_get_changes(self):
+        """Return the changes made to the resource instance since it was
+        created or since the last call to `occi_clear_changes()`. Returns None
+        if the resource instance is unmodified.
+
+        >>> fooMixin = Mixin('foo', 'http://example.com/occi#', attributes=[Attribute('com.example.foo')])
+        >>> entity = Entity(EntityKind)
+        >>> entity.occi_clear_changes()
+        >>> entity.occi_get_changes()
+        >>> entity.occi_add_mixin(fooMixin)
+        >>> entity.occi_import_attributes([('occi.core.title', 'Foo'), ('com.example.foo', 'foo')])
+        >>> changes = entity.occi_get_changes()
+        >>> sorted(changes.attributes)
+        [('com.example.foo', 'foo'), ('occi.core.title', 'Foo')]
+        >>> changes.mixins_added, changes.mixins_removed
+        ([Mixin('foo', 'http://example.com/occi#')], [])
+        >>> entity.occi_clear_changes()
+        >>> entity.occi_remove_mixin(fooMixin)
+        >>> changes = entity.occi_get_changes()
+        >>> changes.attributes, changes.mixins_added, changes.mixins_removed
+        ([], [], [Mixin('foo', 'http://example.com/occi#')])
+        """
+        changeset = self._occi_changes
+        if changeset is None:
+            return None
+        schema = self._occi_schema
+        attributes = []
+        for name in changeset.attributes:
+            if name in schema.index:
+                attributes.append((name, self.occi_get_attribute(name)))
+        mixins_added = []
+        mixins_removed = []
+        for mixin, added in changeset.mixins.itervalues():
+            if added:
+                mixins_added.append(mixin)
+            else:
+                mixins_removed.append(mixin)
+        actions = [(cat_id, self.occi_is_applicable_action(cat_id))
+                for cat_id in changeset.actions]
+        return EntityChanges(self, attributes=attributes,
+                mixins_added=mixins_added, mixins_removed=mixins_removed,
+                actions=actions)
+
+    def occi_clear_changes(self):
+        """Mark the resource instance as unmodified, e.g. after it has been
+        loaded from or saved to persistent storage.
+        """
+        self._occi_changes = None
+
+    def __reduce__(self):
+        """The Kind, Mixins and applicable Actions are pickled by identifier
+        and re-bound to the `CategoryRegistry` of the receiving process, see
+        `Category.__reduce__()`. Attribute values are pickled in native
+        format. Pending changes are not pickled.
+
+        >>> import pickle
+        >>> reg = CategoryRegistry()
+        >>> startAction = Category('start', 'http://example.com/occi/foo/action#')
+        >>> fooKind = Kind('foo', 'http://example.com/occi#', related=ResourceKind, actions=[startAction], attributes=[IntAttribute('com.example.size')])
+        >>> reg.register(fooKind)
+        >>> entity = Resource(fooKind)
+        >>> entity.occi_import_attributes([('occi.core.id', '10000000-0000-4000-0000-000000000000'), ('com.example.size', '42')], validate=False, lazy=True)
+        >>> entity.occi_set_applicable_action(startAction)
+        >>> data = pickle.dumps(entity, 2)
+        >>> fooKind.id in data, 'IntAttribute' in data
+        (True, False)
+        >>> clone = pickle.loads(data)
+        >>> clone.occi_get_kind() is fooKind
+        True
+        >>> clone.occi_export_attributes(convert=False)
+        [('occi.core.id', UUID('10000000-0000-4000-0000-000000000000')), ('com.example.size', 42)]
+        >>> clone.id is entity.id
+        True
+        >>> clone.occi_list_applicable_actions()
+        [Category('start', 'http://example.com/occi/foo/action#')]
+        >>> clone.occi_get_fingerprint() == entity.occi_get_fingerprint()
+        True
+        >>> clone.occi_get_changes()
+
+        The resource instance is restored without calling the constructor of
+        its type, the instance dictionary of a sub-type is pickled along.
+
+        >>> class SizedResource(Resource):
+        ...     def __init__(self, kind, size):
+        ...         super(SizedResource, self).__init__(kind)
+        ...         self.size = size
+        >>> entity = SizedResource(fooKind, 'large')
+        >>> restore, args, state = entity.__reduce__()
+        >>> clone = restore(*args)
+        >>> clone.__setstate__(state)
+        >>> clone.size, clone.occi_get_kind() is fooKind
+        ('large', True)
+        """
+        return (_restore_entity, (self.__class__, self._occi_kind,
+            tuple(self._occi_mixins)), self.__getstate__())
+
+    def __getstate__(self):
+        attributes = []
+        for i, (attribute, value) in enumerate(zip(self._occi_schema.attributes,
+                self._occi_values)):
+            if value is _UNSET:
+                continue
+            if value.__class__ is _Raw:
+                value = self._occi_native(i)
+            attributes.append((attribute.name, value))
+        state = {'attributes': attributes,
+                'actions': self.occi_list_applicable_actions()}
+        if self._occi_translator is not _default_translator:
+            state['translator'] = self._occi_translator
+        if self._occi_extra:
+            state['extra'] = self._occi_extra
+        if getattr(self, '__dict__', None):
+            state['dict'] = self.__dict__
+        return state
+
+    def __setstate__(self, state):
+        self._occi_actions_applicable = 0
+        for action in state['actions']:
+            self.occi_set_applicable_action(action)
+        index = self._occi_schema.index
+        values = self._occi_values
+        for name, value in state['attributes']:
+            if isinstance(value, uuid.UUID):
+                value = intern_uuid(str(value))
+            try:
+                values[index[name]] = value
+            except KeyError:
+                raise self.UnknownAttribute(name)
+        self._occi_translator = state.get('translator', _default_translator)
+        self._occi_changes = None
+        if 'extra' in state:
+            self._occi_extra = dict(state['extra'])
+        if 'dict' in state:
+            self.__dict__.update(state['dict'])
+
+    def _occi_fingerprint_parts(self):
+        parts = [self._occi_kind.id]
+        parts.append(sorted([m.id for m in self._occi_mixins]))
+        schema = self._occi_schema
+        for i, (attribute, value, default) in enumerate(zip(schema.attributes,
+                self._occi_values, schema.defaults)):
+            if value is _UNSET:
+                value = default
+            elif value.__class__ is _Raw:
+                value = self._occi_native(i)
+            if value is not _UNSET:
+                value = attribute.from_native(value, translator=_default_translator)
+                parts.append((attribute.name, value))
+        parts.append(sorted([action.id for action in
+            schema.iter_actions(self._occi_actions_applicable)]))
+        return parts
+
+    def _set_mixins(self, mixins):
+        """Set list of Mixins and move the attribute values into the layout
+        of the new `EntitySchema`.
+        """
+        schema = EntitySchema.get(self._occi_kind, mixins)
+        values = [_UNSET] * len(schema.attributes)
+        old_index = self._occi_schema.index
+        old_defaults = self._occi_schema.defaults
+
+        # Keep values of attributes no longer defined aside, see
+        # occi_set_attribute()
+        extra = self._occi_extra
+        for j, attribute in enumerate(self._occi_schema.attributes):
+            if attribute.name not in schema.index and \
+                    self._occi_values[j] is not _UNSET:
+                if extra is None:
+                    extra = {}
+                extra[attribute.name] = self._occi_native(j)
+
+        for i, attribute in enumerate(schema.attributes):
+            try:
+                j = old_index[attribute.name]
+            except KeyError:
+                if extra and attribute.name in extra:
+                    values[i] = extra.pop(attribute.name)
+                continue
+            # Keep the effective value if the default value changes
+            value = self._occi_values[j]
+            if value is _UNSET and not _is_default(old_defaults[j],
+                    schema.defaults[i]):
+                value = old_defaults[j]
+            values[i] = value
+
+        # Move applicable state into the new action bitmask, dropping actions
+        # no longer available
+        applicable = 0
+        for action in self._occi_schema.iter_actions(self._occi_actions_applicable):
+            applicable |= schema.action_bits.get(action.id, 0)
+        self._occi_actions_applicable = applicable
+
+        # Record added and removed Mixins
+        mixin_changes = self._occi_track().mixins
+        new_mixins = set(mixins)
+        for mixin in self._occi_mixins:
+            if mixin not in new_mixins:
+                self._occi_record_mixin(mixin_changes, mixin, False)
+        old_mixins = set(self._occi_mixins)
+        for mixin in mixins:
+            if mixin not in old_mixins:
+                self._occi_record_mixin(mixin_changes, mixin, True)
+
+        self._occi_mixins = tuple(mixins)
+        self._occi_schema = schema
+        self._occi_values = values
+        self._occi_extra = extra
+        self._occi_cow = False
+        self._occi_version += 1
+
+    def _occi_record_mixin(self, mixin_changes, mixin, added):
+        try:
+            # Adding a removed Mixin (or vice versa) cancels out
+            if mixin_changes[mixin.id][1] != added:
+                del mixin_changes[mixin.id]
+                return
+        except KeyError:
+            pass
+        mixin_changes[mixin.id] = (mixin, added)
 
     def occi_get_kind(self):
         return self._occi_kind
 
-    def occi_add_mixin(self, mixin):
-        cat_id = str(mixin)
+    def occi_get_mixins(self):
+        return list(self._occi_mixins)
 
+    def occi_add_mixin(self, mixin):
         # Must be a Mixin type
         if not isinstance(mixin, Mixin):
             raise self.InvalidCategory(mixin, 'not a Mixin instance')
 
-        # Save mixin
-        self._occi_mixins[cat_id] = mixin
-        self._add_actions_available(mixin.actions)
+        # Save mixin, replacing any previous instance of the same Mixin
+        mixins = [m for m in self._occi_mixins if m.id != mixin.id]
+        mixins.append(mixin)
+        self._set_mixins(mixins)
 
     def occi_remove_mixin(self, mixin):
-        try:
-            mixin = self._occi_mixins.pop(str(mixin))
-            self._remove_actions_available(mixin.actions)
-        except KeyError:
+        cat_id = _category_id(mixin)
+        mixins = [m for m in self._occi_mixins if m.id != cat_id]
+        if len(mixins) == len(self._occi_mixins):
             raise self.UnknownCategory(mixin, 'not found')
+        self._set_mixins(mixins)
 
     def occi_list_categories(self):
-        return [self._occi_kind] + self._occi_mixins.values()
+        return [self._occi_kind] + list(self._occi_mixins)
 
     def occi_set_translator(self, translator):
         self._occi_translator = translator
 
     def occi_get_attribute(self, name, convert=False):
         """Get single OCCI attribute (native) value."""
-        value = self._occi_attributes.get(name)
+        try:
+            i = self._occi_schema.index[name]
+        except KeyError:
+            extra = self._occi_extra
+            return extra.get(name) if extra else None
+        value = self._occi_values[i]
+        if value is _UNSET:
+            value = self._occi_schema.defaults[i]
+            if value is _UNSET:
+                return None
         if convert:
-            for category in self.occi_list_categories():
-                for attribute in category.attributes.itervalues():
-                    if attribute.name == name:
-                        value = attribute.from_native(value,
-                                translator=self._occi_translator)
-                        break
+            value = _from_native(self._occi_schema.attributes[i], value,
+                    self._occi_translator)
+        elif value.__class__ is _Raw:
+            value = self._occi_native(i)
+        return value
+
+    def _occi_native(self, i):
+        """Return the native attribute value at position i, converting a raw
+        value imported using `lazy=True`. The converted value replaces the
+        raw value, also in storage shared with clones as the values are
+        equivalent.
+        """
+        value = self._occi_values[i]
+        if value.__class__ is _Raw:
+            value = self._occi_schema.attributes[i].to_native(value.value,
+                    translator=value.translator)
+            self._occi_values[i] = value
         return value
 
     def occi_set_attribute(self, name, value):
-        """Set single OCCI attribute (native) value."""
-        self._occi_attributes[name] = value
+        """Set single OCCI attribute (native) value.
+
+        A value of an attribute not defined by the Kind or Mixins is kept
+        aside, it is not exported but taken over by a Mixin defining the
+        attribute later on.
+
+        >>> fooMixin = Mixin('foo', 'http://example.com/occi#', attributes=[Attribute('com.example.foo')])
+        >>> entity = Entity(EntityKind)
+        >>> entity.occi_set_attribute('com.example.foo', 'foo')
+        >>> entity.occi_get_attribute('com.example.foo'), entity.occi_export_attributes()
+        ('foo', [])
+        >>> entity.occi_add_mixin(fooMixin)
+        >>> entity.occi_export_attributes()
+        [('com.example.foo', 'foo')]
+        >>> entity.occi_remove_mixin(fooMixin)
+        >>> entity.occi_get_attribute('com.example.foo')
+        'foo'
+        """
+        try:
+            i = self._occi_schema.index[name]
+        except KeyError:
+            if self._occi_extra is None:
+                self._occi_extra = {}
+            self._occi_extra[name] = value
+            self._occi_version += 1
+            return
+        self._occi_unshare()
+        self._occi_values[i] = value
+        self._occi_track().attributes.add(name)
+        self._occi_version += 1
 
     def occi_export_attributes(self, convert=True, exclude=()):
         """Export the OCCI attributes defined for this resource instance as a
@@ -528,22 +1814,23 @@ class Entity(object):
         :keyword exclude: A list of attribute names to exclude.
         """
         attr_list = []
-        for category in self.occi_list_categories():
-            for attribute in category.attributes.itervalues():
-                if attribute.name in exclude:
-                    continue
-                try:
-                    value = self._occi_attributes[attribute.name]
-                except KeyError:
-                    pass
-                else:
-                    if convert:
-                        value = attribute.from_native(value,
-                                translator=self._occi_translator)
-                    attr_list.append((attribute.name, value))
+        translator = self._occi_translator
+        schema = self._occi_schema
+        for i, (attribute, value, default) in enumerate(zip(schema.attributes,
+                self._occi_values, schema.defaults)):
+            if value is _UNSET:
+                value = default
+            if value is _UNSET or attribute.name in exclude:
+                continue
+            if convert:
+                value = _from_native(attribute, value, translator)
+            elif value.__class__ is _Raw:
+                value = self._occi_native(i)
+            attr_list.append((attribute.name, value))
         return attr_list
 
-    def occi_import_attributes(self, attr_list, convert=True, validate=True):
+    def occi_import_attributes(self, attr_list, convert=True, validate=True,
+            lazy=False):
         """Import values for the OCCI attributes defined for this resource
         instance.
 
@@ -553,6 +1840,10 @@ class Entity(object):
         :keyword convert: If True convert from external representation to
             OCCI native format.
         :keyword validate: Boolean whether to validate the attribute set
+        :keyword lazy: If True (and convert is True) defer the conversion to
+            native format until the native value is first accessed. Export in
+            external representation returns the imported values unchanged.
+            Invalid attribute values are reported on access.
 
         >>> fooKind = Kind('foo', 'http://example.com/occi#', title='Foo', related=ResourceKind, attributes=[Attribute('com.example.bar', required=True, mutable=True)])
         >>> entity = Entity(fooKind)
@@ -573,64 +1864,78 @@ class Entity(object):
             File "core.py", line 256, in occi_import_attributes
                 raise self.DuplicateAttribute(attr)
         DuplicateAttribute: "occi.core.summary": Duplicate attribute
+        >>> from occi.ext.infrastructure import ComputeKind
+        >>> entity = Entity(ComputeKind)
+        >>> entity.occi_import_attributes([('occi.compute.memory', '2.0')], lazy=True)
+        >>> entity.occi_export_attributes()
+        [('occi.compute.memory', '2.0')]
+        >>> entity.occi_get_attribute('occi.compute.memory')
+        2.0
 
         """
-        # Load supplied attributes into a dictionary
-        attr_dict = {}
-        for attr, value in attr_list:
-            if attr in attr_dict:
-                raise self.DuplicateAttribute(attr)
-            attr_dict[attr] = value
+        # Check supplied attributes for duplicates
+        names = set()
+        for name, value in attr_list:
+            if name in names:
+                raise self.DuplicateAttribute(name)
+            names.add(name)
 
         # Add attributes to the Entity instance
-        for category in self.occi_list_categories():
-            for attribute in category.attributes.itervalues():
-                try:
-                    value = attr_dict[attribute.name]
-                    del attr_dict[attribute.name]
-                except KeyError:
-                    pass
-                else:
-                    # Attribute mutable if:
-                    #  - attribute.mutable == True
-                    #  - attribute.required == True and attribute.mutable == False and attribute not yet specified (write once)
-                    if not validate or attribute.mutable or (
-                            attribute.required and attribute.name not in self._occi_attributes):
-                        # Convert attribute value to native format
-                        if convert:
-                            value = attribute.to_native(value,
-                                translator=self._occi_translator)
-                        # Save the new attibute value
-                        self._occi_attributes[attribute.name] = value
-                    else:
-                        raise self.ImmutableAttribute(attribute.name)
-
-                # Check required attribute
-                if validate and attribute.required and attribute.name not in self._occi_attributes:
-                    raise self.RequiredAttribute(attribute.name)
-
-        # Verify all supplied attributes have been handled
-        if attr_dict:
-            raise self.UnknownAttribute(attr_dict.keys()[0])
+        self._occi_unshare()
+        schema = self._occi_schema
+        values = self._occi_values
+        changed = self._occi_track().attributes
+        self._occi_version += 1
+        for name, value in attr_list:
+            try:
+                i = schema.index[name]
+            except KeyError:
+                raise self.UnknownAttribute(name)
+
+            # Attribute mutable if:
+            #  - attribute.mutable == True
+            #  - attribute.required == True and attribute.mutable == False and attribute not yet specified (write once)
+            if validate and name not in schema.mutable and not (
+                    name in schema.required and values[i] is _UNSET):
+                raise self.ImmutableAttribute(name)
+
+            # Convert attribute value to native format
+            if lazy and convert:
+                value = _Raw(value, self._occi_translator)
+            elif convert:
+                value = schema.attributes[i].to_native(value,
+                        translator=self._occi_translator)
+
+            # Save the new attibute value
+            values[i] = value
+            changed.add(name)
+
+        # Check required attributes
+        if validate:
+            for name in schema.required:
+                i = schema.index[name]
+                if values[i] is _UNSET and schema.defaults[i] is _UNSET:
+                    raise self.RequiredAttribute(name)
 
     def occi_list_actions(self):
         """Return a list of Category instances which define the Actions
         _available_ to this resource instance.
         """
-        return self._occi_actions_available.values()
+        return self._occi_schema.actions.values()
 
     def occi_list_applicable_actions(self):
         """Return a list of Category instances which define the Actions
         currently _applicable_ to this resource instance.
         """
-        return [self._occi_actions_available[cat_id] for cat_id in self._occi_actions_applicable.keys()]
+        return list(self._occi_schema.iter_actions(self._occi_actions_applicable))
 
     def occi_is_applicable_action(self, action_category):
         """Return whether the given Category instance correspond to a currently
         applicable Action.
         """
-        cat_id = str(action_category)
-        return cat_id in self._occi_actions_applicable and cat_id in self._occi_actions_available
+        cat_id = _category_id(action_category)
+        return bool(self._occi_actions_applicable &
+                self._occi_schema.action_bits.get(cat_id, 0))
 
     def occi_set_applicable_action(self, action_category, applicable=True):
         """Set 'applicable' state of an action. By default all actions defined
@@ -661,13 +1966,164 @@ class Entity(object):
         UnknownCategory: "http://example.com/occi/foo/action#stop": Unknown Category: Action not defined for this resource instance
 
         """
-        cat_id = str(action_category)
-        if cat_id not in self._occi_actions_available:
+        cat_id = _category_id(action_category)
+        try:
+            bit = self._occi_schema.action_bits[cat_id]
+        except KeyError:
             raise self.UnknownCategory(cat_id, 'Action not defined for this resource instance')
         if applicable:
-            self._occi_actions_applicable[cat_id] = True
+            self._occi_actions_applicable |= bit
         else:
-            self._occi_actions_applicable.pop(cat_id, None)
+            self._occi_actions_applicable &= ~bit
+        self._occi_track().actions.add(cat_id)
+        self._occi_version += 1
+
+def _restore_entity(cls, kind, mixins):
+    # Set the Entity state directly, sub-types may have other constructors
+    entity = cls.__new__(cls)
+    entity._occi_kind = kind
+    entity._occi_mixins = tuple(mixins)
+    entity._occi_schema = EntitySchema.get(kind, mixins)
+    entity._occi_values = [_UNSET] * len(entity._occi_schema.attributes)
+    entity._occi_actions_applicable = 0
+    entity._occi_translator = _default_translator
+    entity._occi_version = 0
+    entity._occi_fingerprint = None
+    entity._occi_changes = None
+    entity._occi_cow = False
+    entity._occi_extra = None
+    return entity
+
+def export_attributes_many(entities, exclude=()):
+    """Export the OCCI attributes of a list of resource instances, converted to
+    external representation. The result is the same as calling
+    `occi_export_attributes()` for each resource instance but the values are
+    converted one attribute column at a time.
+
+    >>> from occi.ext.infrastructure import ComputeKind
+    >>> computes = [Resource(ComputeKind) for i in range(3)]
+    >>> for i, compute in enumerate(computes):
+    ...     compute.occi_import_attributes([('occi.compute.cores', str(i)), ('occi.compute.memory', '%d.5' % i)], validate=False)
+    >>> export_attributes_many(computes) == [c.occi_export_attributes() for c in computes]
+    True
+    >>> export_attributes_many(computes)[2]
+    [('occi.compute.cores', 2), ('occi.compute.memory', 2.5)]
+    """
+    # Group resource instances sharing attribute layout and translator
+    groups = OrderedDict()
+    for i, entity in enumerate(entities):
+        key = (entity._occi_schema, entity._occi_translator)
+        groups.setdefault(key, []).append(i)
+
+    result = [None] * len(entities)
+    for (schema, translator), positions in groups.iteritems():
+        rows = [[] for i in positions]
+        value_lists = [entities[i]._occi_values for i in positions]
+        for j, attribute in enumerate(schema.attributes):
+            if attribute.name in exclude:
+                continue
+            default = schema.defaults[j]
+            column = [values[j] for values in value_lists]
+            if default is not _UNSET:
+                column = [default if v is _UNSET else v for v in column]
+            column_rows = [row for row, v in zip(rows, column) if v is not _UNSET]
+            if len(column_rows) < len(column):
+                column = [v for v in column if v is not _UNSET]
+            if any(v.__class__ is _Raw for v in column):
+                column = [_from_native(attribute, v, translator) for v in column]
+            else:
+                column = attribute.from_native_many(column, translator=translator)
+            name = attribute.name
+            for row, value in zip(column_rows, column):
+                row.append((name, value))
+        for i, row in zip(positions, rows):
+            result[i] = row
+    return result
+
+def import_attributes_many(entities, attr_lists, validate=True):
+    """Import attribute values in external representation into a list of
+    resource instances. The result is the same as calling
+    `occi_import_attributes()` for each resource instance but the values are
+    converted one attribute column at a time.
+
+    >>> from occi.ext.infrastructure import ComputeKind
+    >>> computes = [Resource(ComputeKind) for i in range(2)]
+    >>> import_attributes_many(computes, [[('occi.compute.cores', '1')], [('occi.compute.cores', '2'), ('occi.compute.speed', '2.4')]], validate=False)
+    >>> [c.occi_export_attributes() for c in computes]
+    [[('occi.compute.cores', 1)], [('occi.compute.cores', 2), ('occi.compute.speed', 2.4)]]
+    >>> import_attributes_many(computes, [[('occi.compute.cores', '1')], [('occi.compute.foo', '2')]], validate=False)
+    Traceback (most recent call last):
+    UnknownAttribute: "occi.compute.foo": Unknown attribute
+    >>> import_attributes_many(computes, [[('occi.compute.cores', '1')], [('occi.compute.speed', 'fast')]], validate=False)
+    Traceback (most recent call last):
+    Invalid: occi.compute.speed='fast': invalid attribute value
+    """
+    # Collect the values by attribute definition and translator
+    columns = OrderedDict()
+    converted = []
+    try:
+        for entity, attr_list in zip(entities, attr_lists):
+            schema = entity._occi_schema
+            row = [None] * len(attr_list)
+            for k, (name, value) in enumerate(attr_list):
+                try:
+                    attribute = schema.by_name[name]
+                except KeyError:
+                    raise Entity.UnknownAttribute(name)
+                key = (attribute, entity._occi_translator)
+                column = columns.setdefault(key, ([], []))
+                column[0].append(value)
+                column[1].append((row, k, name))
+            converted.append(row)
+        for (attribute, translator), (values, targets) in columns.iteritems():
+            values = attribute.to_native_many(values, translator=translator)
+            for value, (row, k, name) in zip(values, targets):
+                row[k] = (name, value)
+    except (Attribute.Invalid, Entity.UnknownAttribute, ValueError, TypeError):
+        # Let the per-entity import report the error
+        for entity, attr_list in zip(entities, attr_lists):
+            entity.occi_import_attributes(attr_list, validate=validate)
+        return
+
+    for entity, attr_list in zip(entities, converted):
+        entity.occi_import_attributes(attr_list, convert=False, validate=validate)
+
+def _linklist_method(name):
+    method = getattr(list, name)
+    def wrapper(self, *args):
+        self.version += 1
+        return method(self, *args)
+    wrapper.__name__ = name
+    return wrapper
+
+class LinkList(list):
+    """List of the Links of a Resource. Keeps a version counter increased
+    on each modification of the list.
+
+    >>> links = LinkList()
+    >>> links.append('a') ; links += ['b', 'c'] ; del links[0]
+    >>> links, links.version
+    (['b', 'c'], 3)
+    """
+    __slots__ = ('version',)
+
+    def __init__(self, *args):
+        super(LinkList, self).__init__(*args)
+        self.version = 0
+
+    append = _linklist_method('append')
+    extend = _linklist_method('extend')
+    insert = _linklist_method('insert')
+    remove = _linklist_method('remove')
+    pop = _linklist_method('pop')
+    sort = _linklist_method('sort')
+    reverse = _linklist_method('reverse')
+    __setitem__ = _linklist_method('__setitem__')
+    __delitem__ = _linklist_method('__delitem__')
+    __setslice__ = _linklist_method('__setslice__')
+    __delslice__ = _linklist_method('__delslice__')
+    __iadd__ = _linklist_method('__iadd__')
+    __imul__ = _linklist_method('__imul__')
 
 class Resource(Entity):
     """OCCI Resource type.
@@ -678,11 +2134,74 @@ class Resource(Entity):
     >>> resource = Resource(ResourceKind)
     >>> resource_id = uuid.uuid4()
     >>> resource.occi_import_attributes([('occi.core.summary', 'Test Resource')])
+    >>> version = resource.occi_get_version()
+    >>> resource.links.append(Link(LinkKind))
+    >>> resource.occi_get_version() - version
+    1
+    >>> resource.links = []
+    >>> resource.occi_get_version() - version
+    2
+    >>> resource.links.append(Link(LinkKind))
+    >>> clone = resource.occi_clone()
+    >>> clone.occi_list_links() is resource.occi_list_links()
+    True
+    >>> clone.links.append(Link(LinkKind))
+    >>> len(clone.occi_list_links()), len(resource.occi_list_links())
+    (2, 1)
     """
+    __slots__ = ('_occi_links', '_occi_links_cow')
+
     def __init__(self, kind, links=None, **kwargs):
+        self._occi_links = LinkList()
+        self._occi_links_cow = False
         super(Resource, self).__init__(kind, **kwargs)
         self.links = links or []
 
+    def occi_clone(self):
+        clone = super(Resource, self).occi_clone()
+        self._occi_links_cow = clone._occi_links_cow = True
+        return clone
+
+    def occi_list_links(self):
+        """Return the list of Links of the Resource. The returned list must
+        not be modified, use the `links` attribute for that purpose.
+        """
+        return self._occi_links
+
+    def _get_links(self):
+        # The list is likely to be modified by the caller
+        if self._occi_links_cow:
+            links = LinkList(self._occi_links)
+            links.version = self._occi_links.version
+            self._occi_links = links
+            self._occi_links_cow = False
+        return self._occi_links
+    def _set_links(self, links):
+        # Keep the version increasing when the list of links is replaced
+        self._occi_version += self._occi_links.version + 1
+        self._occi_links = LinkList(links)
+        self._occi_links_cow = False
+    links = property(_get_links, _set_links)
+
+    def occi_get_version(self):
+        return self._occi_version + self._occi_links.version
+
+    def __getstate__(self):
+        state = super(Resource, self).__getstate__()
+        state['links'] = list(self._occi_links)
+        return state
+
+    def __setstate__(self, state):
+        self._occi_links = LinkList()
+        self._occi_links_cow = False
+        super(Resource, self).__setstate__(state)
+        self.links = state['links']
+
+    def _occi_fingerprint_parts(self):
+        parts = super(Resource, self)._occi_fingerprint_parts()
+        parts.append([str(link.id) for link in self._occi_links])
+        return parts
+
 class Link(Entity):
     """OCCI Link type.
 
@@ -694,6 +2213,8 @@ class Link(Entity):
     >>> link = Link(LinkKind)
     >>> link.occi_import_attributes([('occi.core.source', source_id.urn), ('occi.core.target', target_id.urn)])
     """
+    __slots__ = ()
+
     def __init__(self, kind, target=None, **kwargs):
         super(Link, self).__init__(kind, **kwargs)
 
@@ -728,6 +2249,9 @@ LinkKind = Kind('link', 'http://schemas.ogf.org/occi/core#',
 ActionCategory = Category('action', 'http://schemas.ogf.org/occi/core#',
         title='Action')
 
+_core_categories = dict([(category.id, category) for category in
+    (EntityKind, ResourceKind, LinkKind, ActionCategory)])
+
 
 if __name__ == "__main__":
     import doctest
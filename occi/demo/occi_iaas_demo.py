@@ -30,16 +30,10 @@ from occi.http.tornado_frontend import TornadoHttpServer
 import occi.http.content_json as content_json
 
 class Compute(occi.core.Resource):
+    __slots__ = ()
+
     def __init__(self, kind, **kwargs):
         super(Compute, self).__init__(kind, **kwargs)
-        attr_default = [
-                ('occi.compute.architecture', 'x86_64'),
-                ('occi.compute.speed', 2.67),
-                ('occi.compute.memory', 1.0),
-                ('occi.compute.state', 'inactive'),
-        ]
-        self.occi_import_attributes(attr_default, validate=False)
-
         self.occi_set_applicable_action(ComputeStartActionCategory)
 
     def exec_action(self, action, payload=None):
@@ -54,10 +48,25 @@ class Compute(occi.core.Resource):
             self.occi_set_applicable_action(ComputeStartActionCategory, applicable=True)
         return None
 
-def init_server(backend):
-    ComputeKind.entity_type = Compute
+# The demo Compute Kind, identical to ComputeKind apart from the entity type
+# and attribute defaults
+DemoComputeKind = Kind(ComputeKind.term, ComputeKind.scheme,
+        title=ComputeKind.title,
+        related=ComputeKind.related,
+        entity_type=Compute,
+        location=ComputeKind.location,
+        attributes=ComputeKind.unique_attributes.values(),
+        actions=ComputeKind.actions,
+        defaults=[
+            ('occi.compute.architecture', 'x86_64'),
+            ('occi.compute.speed', 2.67),
+            ('occi.compute.memory', 1.0),
+            ('occi.compute.state', 'inactive'),
+        ],
+)
 
-    backend.registry.register(ComputeKind)
+def init_server(backend):
+    backend.registry.register(DemoComputeKind)
     backend.registry.register(NetworkKind)
     backend.registry.register(IPNetworkMixin)
     backend.registry.register(StorageKind)
@@ -107,7 +107,7 @@ class JSONRenderer(Renderer):
 
             d['title'] = category.title
             if category.related:
-                d['related'] = str(category.related)
+                d['related'] = category.related.id
             if category.attributes:
                 attr_defs = OrderedDict()
                 for attr in category.unique_attributes.itervalues():
@@ -120,7 +120,7 @@ class JSONRenderer(Renderer):
             if category.defaults:
                 d['defaults'] = category.defaults
             if hasattr(category, 'actions') and category.actions:
-                d['actions'] = [str(cat) for cat in category.actions]
+                d['actions'] = [cat.id for cat in category.actions]
             if hasattr(category, 'location') and category.location:
                 d['location'] = obj.translator.url_build(category.location, path_only=True)
 
@@ -138,11 +138,11 @@ class JSONRenderer(Renderer):
             if link.target_title:
                 d['title'] = link.target_title
             d['target_uri'] = link.target_location
-            d['target_type'] = [str(cat) for cat in link.target_categories]
+            d['target_type'] = [cat.id for cat in link.target_categories]
             if link.link_location:
                 d['link_uri'] = link.link_location
             if link.link_categories:
-                d['link_type'] = [str(cat) for cat in link.link_categories]
+                d['link_type'] = [cat.id for cat in link.link_categories]
             if link.link_attributes:
                 attrs = OrderedDict()
                 for name, value in link.link_attributes:
@@ -157,7 +157,7 @@ class JSONRenderer(Renderer):
                 d['title'] = action.target_title
             d['uri'] = action.target_location
             assert(len(action.target_categories) == 1)
-            d['type'] = str(action.target_categories[0])
+            d['type'] = action.target_categories[0].id
             json_obj['actions'].append(d)
 
         # Attributes
@@ -17,10 +17,11 @@
 # along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import logging
 import urlparse
 import uuid
 
-from occi.core import Attribute, Category, Kind, Mixin, Entity, Resource, Link, Action, EntityTranslator, EntityKind
+from occi.core import Attribute, Category, Kind, Mixin, Entity, Resource, Link, Action, EntityTranslator, EntityRef, uuid_str
 
 class DataObject(object):
     """A data object transferred using the OCCI protocol.
@@ -63,17 +64,18 @@ class DataObject(object):
         if self.attributes:
             for attr, value in self.attributes:
                 if attr == 'occi.core.id':
-                    entity = Entity(EntityKind)
-                    entity.occi_import_attributes([('occi.core.id', value)], validate=False)
-                    entity_id = entity.id
+                    entity_id = EntityRef(value).id
         elif self.location:
             entity = self.translator.to_native(self.location)
             if entity: entity_id = entity.id
         return entity_id
 
-    def load_from_entity(self, entity):
+    def load_from_entity(self, entity, attributes=None):
         """Load `DataObject` with the contents of the specified Entity instance.
 
+        :keyword attributes: The exported attributes of the Entity instance,
+            if already available. See `occi.core.export_attributes_many()`.
+
         >>> from occi.ext.infrastructure import *
         >>> compute = ComputeKind.entity_type(ComputeKind)
         >>> compute.occi_import_attributes([('occi.core.id', '10000000-0000-4000-0000-000000000000'), ('occi.compute.speed', 7.0/3)], validate=False)
@@ -99,6 +101,11 @@ class DataObject(object):
         [('/api/link/storage/30000000-0000-4000-0000-000000000000', [Kind('storagelink', 'http://schemas.ogf.org/occi/infrastructure#')], [('occi.storagelink.deviceid', 'ide:0:1')])]
         >>> [(a.target_location, a.target_categories, a.target_title) for a in d.actions]
         [('/api/compute/10000000-0000-4000-0000-000000000000?action=start', [Category('start', 'http://schemas.ogf.org/occi/infrastructure/compute/action#')], 'Start Compute Resource')]
+        >>> link.occi_set_attribute('occi.core.target', EntityRef(storage.id, kind=StorageKind))
+        >>> d = DataObject(translator=URLTranslator('/api/'))
+        >>> d.load_from_entity(compute)
+        >>> [(l.target_location, l.target_categories, l.target_title) for l in d.links]
+        [('/api/storage/20000000-0000-4000-0000-000000000000', [Kind('storage', 'http://schemas.ogf.org/occi/infrastructure#')], None)]
 
         """
         # Set location translator for Entity instance
@@ -106,7 +113,9 @@ class DataObject(object):
 
         # Get Entity Kind, Mixins, Attributes and ID
         self.categories = entity.occi_list_categories()
-        self.attributes = entity.occi_export_attributes(convert=True)
+        if attributes is None:
+            attributes = entity.occi_export_attributes(convert=True)
+        self.attributes = attributes
         self.location = self.translator.from_native(entity)
 
         # Mark object a resource instance for content-aware renderers
@@ -114,17 +123,24 @@ class DataObject(object):
 
         # Links
         if isinstance(entity, Resource):
-            for link in entity.links:
+            for link in entity.occi_list_links():
                 link.occi_set_translator(self.translator)
                 target = link.occi_get_attribute('occi.core.target')
                 if not target:
                     # Ignore incomplete Link object
-                    print "%s: occi.core.target not defined" % link.id
+                    logging.warning('%s: occi.core.target not defined', link.id)
                     continue
+                # A reference no longer resolving into a live Entity instance
+                # is rendered from its ID and Kind
+                target_title = None
+                if isinstance(target, EntityRef) and target.resolve() is not None:
+                    target = target.resolve()
+                if not isinstance(target, EntityRef):
+                    target_title = target.occi_get_attribute('occi.core.title')
                 l = LinkRepr(
                         target_location=link.occi_get_attribute('occi.core.target', convert=True),
                         target_categories=target.occi_list_categories(),
-                        target_title=target.occi_get_attribute('occi.core.title'),
+                        target_title=target_title,
                         link_location=self.translator.from_native(link))
                 link_attributes = link.occi_export_attributes(convert=True,
                         exclude=('occi.core.id', 'occi.core.source', 'occi.core.target'))
@@ -145,9 +161,12 @@ class DataObject(object):
             self.actions.append(l)
 
     def save_to_entity(self, entity=None, category_registry=None,
-            validate_attr=True, save_links=False):
+            validate_attr=True, save_links=False, save_attributes=True):
         """Save the `DataObject` contents into an Entity instance.
 
+        If `save_attributes` is False the attributes are left for the caller
+        to import, e.g. using `occi.core.import_attributes_many()`.
+
         >>> from occi.ext.infrastructure import *
         >>> d = DataObject(translator=URLTranslator('/api'))
         >>> d.location = '/api/compute/10000000-0000-4000-0000-000000000000'
@@ -194,7 +213,7 @@ class DataObject(object):
                 raise self.Invalid('Kind not specified, cannot create Entity')
             entity = kind.entity_type(kind, mixins=mixins)
         else:
-            if kind and str(kind) != str(entity.occi_get_kind()):
+            if kind and kind != entity.occi_get_kind():
                 raise self.Invalid('Cannot change Kind of existing Entity')
             [entity.occi_add_mixin(mixin) for mixin in mixins]
 
@@ -202,10 +221,11 @@ class DataObject(object):
         entity.occi_set_translator(self.translator)
 
         # Load attributes
-        try:
-            entity.occi_import_attributes(self.attributes, validate=validate_attr)
-        except (Entity.EntityError, Attribute.Invalid) as e:
-            raise self.Invalid(e)
+        if save_attributes:
+            try:
+                entity.occi_import_attributes(self.attributes, validate=validate_attr)
+            except (Entity.EntityError, Attribute.Invalid) as e:
+                raise self.Invalid(e)
 
         # Load Link relations
         if save_links and self.links:
@@ -250,9 +270,9 @@ class DataObject(object):
         # Resolve Categories and extract Kind
         for category in categories:
             if category_registry:
-                category = category_registry.lookup_id(str(category))
+                category = category_registry.lookup_id(category)
             if isinstance(category, Kind):
-                if kind is not None and str(kind) != str(category):
+                if kind is not None and kind != category:
                     raise self.Invalid('%s: Only one Kind allowed to define a resource' % category)
                 kind = category
             elif isinstance(category, Mixin):
@@ -320,11 +340,8 @@ class URLTranslator(EntityTranslator):
     >>> s = translator.from_native(compute)
     >>> s
     'http://example.com/api/compute/10000000-0000-4000-0000-000000000000'
-    >>> entity = translator.to_native(s)
-    >>> entity.id
-    UUID('10000000-0000-4000-0000-000000000000')
-    >>> entity.occi_list_categories()
-    [Kind('entity', 'http://schemas.ogf.org/occi/core#')]
+    >>> translator.to_native(s)
+    EntityRef(UUID('10000000-0000-4000-0000-000000000000'))
     """
     def __init__(self, base_url):
         t = urlparse.urlparse(base_url.rstrip('/'))
@@ -345,7 +362,7 @@ class URLTranslator(EntityTranslator):
        return url[i:].lstrip('/')
 
     def from_native(self, entity, path_only=False):
-        s = str(entity.id)
+        s = uuid_str(entity.id)
         kind = entity.occi_get_kind()
         if hasattr(kind, 'location') and kind.location:
             s = kind.location + s
@@ -357,9 +374,7 @@ class URLTranslator(EntityTranslator):
         i = location.rfind('/')
         if i + 1 < len(location):
             entity_id = location[i+1:]
-        entity = Entity(EntityKind)
-        entity.occi_import_attributes([('occi.core.id', entity_id)], validate=False)
-        return entity
+        return EntityRef(entity_id)
 
 if __name__ == "__main__":
     import doctest
@@ -18,7 +18,7 @@
 #
 
 from occi import OrderedDict
-from occi.core import Category, Kind, Mixin, Entity
+from occi.core import Attribute, Category, Kind, Mixin, Entity, LinkKind, export_attributes_many, import_attributes_many
 from occi.backend import ServerBackend
 from occi.http import get_parser, get_renderer, HttpRequest, HttpResponse
 from occi.http.header import HttpHeaderError
@@ -55,6 +55,8 @@ class HttpResponseCode(object):
         return self.http_response(401, msg)
     def NOT_FOUND(self, msg='Not Found'):
         return self.http_response(404, msg)
+    def NOT_ACCEPTABLE(self, msg='Not Acceptable'):
+        return self.http_response(406, msg)
     def CONFLICT(self, msg='Conflict/Duplicate'):
         return self.http_response(401, msg)
     def NOT_HERE(self, msg='Gone'):
@@ -78,16 +80,18 @@ class HandlerBase(object):
         """Parse request and initialize response renderer."""
         try:
             parser = get_parser(request.content_type,
-                    translator=self.translator)
+                    translator=self.translator,
+                    category_registry=self.backend.registry)
             parser.parse(request.headers, request.body)
         except (ParserError, HttpHeaderError) as e:
             raise HttpRequestError(hrc.BAD_REQUEST(e))
 
         # Get renderer
         try:
-            renderer = get_renderer(parser.accept_types)
+            renderer = get_renderer(parser.accept_types,
+                    accept_header=parser.accept_header)
         except RendererError as e:
-            raise HttpRequestError(hrc.BAD_REQUEST(e))
+            raise HttpRequestError(hrc.NOT_ACCEPTABLE(e))
 
         return parser, renderer
 
@@ -132,6 +136,36 @@ class HandlerBase(object):
             print e
             raise HttpRequestError(hrc.SERVER_ERROR())
 
+    def _filter_links(self, target, categories=None, dao_filter=None, user=None):
+        """Get the Link objects pointing at the target location, related to
+        any of the specified categories and matching the `DataObject` filter.
+        """
+        try:
+            target_id = self.translator.to_native(target).id
+        except Attribute.Invalid as e:
+            raise HttpRequestError(hrc.BAD_REQUEST(e))
+        try:
+            links = self.backend.filter_links(target=target_id, user=user)
+        except ServerBackend.InvalidOperation as e:
+            raise HttpRequestError(hrc.BAD_REQUEST(e))
+        except ServerBackend.ServerBackendError as e:
+            print e
+            raise HttpRequestError(hrc.SERVER_ERROR())
+
+        # Apply the category and attribute filter of the request
+        if dao_filter:
+            link_ids = set([link.id for link in self._filter_entities(
+                categories=[LinkKind], dao_filter=dao_filter, user=user)])
+            links = [link for link in links if link.id in link_ids]
+
+        result = []
+        for link in links:
+            for c in link.occi_list_categories():
+                if any(c.is_related(cat) for cat in categories or ()):
+                    result.append(link)
+                    break
+        return result
+
     def _save_entities(self, entities=None, delete_entity_ids=None, user=None):
         """Save Entity objects to backend."""
         try:
@@ -144,6 +178,22 @@ class HandlerBase(object):
             print e
             raise HttpRequestError(hrc.SERVER_ERROR())
 
+    def _update_entities(self, entities, user=None):
+        """Save the changes of modified Entity objects to backend."""
+        changes = [e.occi_get_changes() for e in entities]
+        changes = [c for c in changes if c is not None]
+        if not changes:
+            return entities
+        try:
+            return self.backend.update_entities(changes, user=user)
+        except Entity.DoesNotExist as e:
+            raise HttpRequestError(hrc.NOT_FOUND(e))
+        except ServerBackend.InvalidOperation as e:
+            raise HttpRequestError(hrc.BAD_REQUEST(e))
+        except ServerBackend.ServerBackendError as e:
+            print e
+            raise HttpRequestError(hrc.SERVER_ERROR())
+
     def _exec_action(self, action, entity, payload=None, user=None):
         """Instruct backend to execute Action on the given Entity."""
         try:
@@ -280,9 +330,9 @@ class EntityHandler(HandlerBase):
         except DataObject.Invalid as e:
             return hrc.BAD_REQUEST(e)
 
-        # Save the updated entity object
+        # Save the changes made to the entity object
         try:
-            id_list = self._save_entities([entity], user=request.user)
+            id_list = self._update_entities([entity], user=request.user)
         except HttpRequestError as e:
             return e.response
 
@@ -381,11 +431,16 @@ class CollectionHandler(HandlerBase):
         categories = self.backend.registry.lookup_recursive(path or '')
 
         # If path is not a Kind/Mixin location filter out everything but Kind
-        # categories
+        # categories. Kinds related to another Kind in the list are covered
+        # by the filter of the more generic Kind.
         if len(categories) > 1:
-            t = []
+            kind_ids = set()
             for category in categories:
                 if isinstance(category, Kind):
+                    kind_ids.add(category.id)
+            t = []
+            for category in categories:
+                if category.id in kind_ids and len(category.ancestors & kind_ids) == 1:
                     t.append(category)
             categories = t
 
@@ -395,12 +450,18 @@ class CollectionHandler(HandlerBase):
         except HttpRequestError as e:
             return e.response
 
-        # Retrieve resource instances from backend
+        # Retrieve resource instances from backend. Inbound links of a
+        # resource instance are queried using the target query argument.
         entities = []
         try:
-            for category in categories:
-                entities.extend(self._filter_entities(categories=[category],
-                        dao_filter=parser.objects, user=request.user))
+            if 'target' in request.query_args:
+                entities = self._filter_links(request.query_args['target'][0],
+                        categories=categories, dao_filter=parser.objects,
+                        user=request.user)
+            else:
+                for category in categories:
+                    entities.extend(self._filter_entities(categories=[category],
+                            dao_filter=parser.objects, user=request.user))
 
         except HttpRequestError as e:
             return e.response
@@ -408,8 +469,11 @@ class CollectionHandler(HandlerBase):
         # Render response
         objects = []
         for entity in entities:
+            entity.occi_set_translator(self.translator)
+        attr_lists = export_attributes_many(entities)
+        for entity, attributes in zip(entities, attr_lists):
             dao = DataObject(translator=self.translator)
-            dao.load_from_entity(entity)
+            dao.load_from_entity(entity, attributes=attributes)
             objects.append(dao)
         renderer.render(objects)
 
@@ -481,6 +545,8 @@ class CollectionHandler(HandlerBase):
                 return e.response
 
         # Convert request objects to entity instances
+        entities_loaded = {}
+        entities = []
         try:
             for dao in parser.objects:
                 # Add location category to entity dao
@@ -501,29 +567,44 @@ class CollectionHandler(HandlerBase):
                 # Attempt to load existing Entity
                 if entity_id and not _do_replace:
                     try:
-                        entity = entities_updated[entity_id]
+                        entity = entities_loaded[entity_id]
                     except KeyError:
-                        entity = self._get_entity(entity_id, user=request.user)
+                        try:
+                            entity = entities_updated[entity_id]
+                        except KeyError:
+                            entity = self._get_entity(entity_id, user=request.user)
                 else:
                     entity = None
 
-                # Create/update entity object
+                # Create/update entity object, attributes are imported below
                 # FIXME: If replacing the entity we leave all links untouched.
                 # This is according to spec but is it convenient?
                 entity = dao.save_to_entity(entity=entity, save_links=(not replace),
-                        category_registry=self.backend.registry)
-                entities_updated[entity.id] = entity
-                entities_deleted.pop(entity.id, None)
-
-                # Add Link objects to list of modified entities
-                if hasattr(entity, 'links'):
-                    for link in entity.links:
-                        entities_updated[link.id] = link
+                        category_registry=self.backend.registry,
+                        save_attributes=False)
+                if entity_id:
+                    entities_loaded[entity_id] = entity
+                entities.append(entity)
+
+            # Import the attributes of all request objects in one batch
+            import_attributes_many(entities,
+                    [dao.attributes for dao in parser.objects])
         except DataObject.Invalid as e:
             return hrc.BAD_REQUEST(e)
+        except (Entity.EntityError, Attribute.Invalid) as e:
+            return hrc.BAD_REQUEST(e)
         except HttpRequestError as e:
             return e.response
 
+        for entity in entities:
+            entities_updated[entity.id] = entity
+            entities_deleted.pop(entity.id, None)
+
+            # Add Link objects to list of modified entities
+            if hasattr(entity, 'links'):
+                for link in entity.occi_list_links():
+                    entities_updated[link.id] = link
+
         # Save (and delete) all affected entities using a single backend operation
         try:
             entities = self._save_entities(
@@ -536,8 +617,11 @@ class CollectionHandler(HandlerBase):
         # Response is a list of created/updated entities
         dao_list = []
         for entity in entities:
+            entity.occi_set_translator(self.translator)
+        attr_lists = export_attributes_many(entities)
+        for entity, attributes in zip(entities, attr_lists):
             dao = DataObject(translator=self.translator)
-            dao.load_from_entity(entity)
+            dao.load_from_entity(entity, attributes=attributes)
             dao_list.append(dao)
 
         # Render response
@@ -616,7 +700,7 @@ class DiscoveryHandler(HandlerBase):
         else:
             for category in parser.objects[0].categories:
                 try:
-                    category = self.backend.registry.lookup_id(str(category))
+                    category = self.backend.registry.lookup_id(category)
                 except Category.DoesNotExist:
                     return hrc.NOT_FOUND('%s: Category not found' % category)
                 else:
@@ -682,7 +766,6 @@ class DiscoveryHandler(HandlerBase):
             for mixin in mixins:
                 mixin = self.backend.add_user_category(mixin, user=request.user)
                 try:
-                    # FIXME: locking needed to avoid race condition
                     self.backend.registry.register(mixin)
                 except Category.Invalid as e:
                     self.backend.remove_user_category(mixin, user=request.user)
@@ -19,7 +19,7 @@
 
 import re
 
-from occi.http.utils import escape_quotes, split_quoted
+from occi.http.utils import escape_quotes, split_quoted, LRUCache
 
 class HttpHeaderError(Exception):
     pass
@@ -80,6 +80,10 @@ class HttpAttributeHeaders(HttpHeadersBase):
     True
     >>> h.headers() == HttpHeadersBase().parse(s)
     True
+    >>> h = HttpAttributeHeaders()
+    >>> h.add('cores', 2) ; h.add('speed', 2.667) ; h.add('size', 10L)
+    >>> str(h)
+    'cores=2, speed=2.67, size="10"'
 
     """
 
@@ -93,53 +97,136 @@ class HttpAttributeHeaders(HttpHeadersBase):
             raise HttpHeaderError
         return (k, v)
 
+    def headers(self):
+        fragment = _attribute_fragment
+        return [fragment(k, v) for k, v in self._headers]
+
     def _to_string(self, header):
-        k, v = header
-        if isinstance(v, int):
-            value_str = str(v)
-        elif isinstance(v, float):
-            value_str = '%.2f' % v
-        elif isinstance(v, bool):
-            value_str = str(v).lower()
+        return _attribute_fragment(*header)
+
+# Maximum number of key=value fragments cached per header type
+FRAGMENT_CACHE_SIZE = 10000
+
+_immutable_types = frozenset([str, int, long, float, bool])
+
+def _fragment_formatter(format_value):
+    """Return a function formatting key=value fragments using format_value().
+    Fragments of immutable values are cached, the cache is cleared when
+    FRAGMENT_CACHE_SIZE is reached.
+    """
+    cache = {}
+    def fragment(k, v):
+        t = v.__class__
+        if t not in _immutable_types:
+            return '%s=%s' % (k, format_value(v))
+        key = (k, t, v)
+        try:
+            return cache[key]
+        except KeyError:
+            pass
+        s = '%s=%s' % (k, format_value(v))
+        if len(cache) >= FRAGMENT_CACHE_SIZE:
+            cache.clear()
+        cache[key] = s
+        return s
+    return fragment
+
+def _format_attribute_value(v):
+    if v.__class__ is str:
+        return '"%s"' % escape_quotes(v)
+    elif isinstance(v, int):
+        # Also bool, being a subclass of int
+        return str(v)
+    elif isinstance(v, float):
+        return '%.2f' % v
+    else:
+        return '"%s"' % escape_quotes(str(v))
+
+def _format_web_value(v):
+    return '"%s"' % escape_quotes(str(v))
+
+# X-OCCI-Attribute and Web Link/Category key=value fragments
+_attribute_fragment = _fragment_formatter(_format_attribute_value)
+_web_fragment = _fragment_formatter(_format_web_value)
+
+# Tokens of Web Link/Category style header values. The last alternative
+# matches any other character, i.e. no part of the value is skipped.
+_web_header_tokens = re.compile(r"""[\s;]*(?:
+      ([^\s=;,"<>]+)\s*=\s*                  # parameter name
+        (?:"((?:[^"\\]|\\[\s\S])*)"?           # quoted parameter value
+        |([^\s;,"](?:[^;,"]*[^\s;,"])?)?)      # unquoted parameter value
+    | <([^>]*)>                             # URI value (Link)
+    | ([^\s=;,"<>]+)                        # token value (Category, media type)
+    | (,)                                   # header separator
+    | ([^\s;])                              # invalid character
+    )""", re.VERBOSE).findall
+
+_unescape = re.compile(r'\\([\s\S])').sub
+
+def iter_web_headers(s, uri=False):
+    """Parse a header value like Web Link/Category consisting of multiple
+    comma-separated headers, each having a value followed by key-value
+    attributes separated by semicolon. The value is tokenized in a single
+    pass, yielding a `(value, attributes)` tuple for each header.
+
+    :keyword uri: If True the value of each header is an URI enclosed in
+        angle brackets, otherwise a token.
+
+    >>> list(iter_web_headers('compute; scheme="http://example.com/occi#"; title="A \\\\"quoted\\\\", title", storage;'))
+    [('compute', [('scheme', 'http://example.com/occi#'), ('title', 'A "quoted", title')]), ('storage', [])]
+    >>> list(iter_web_headers('</api/storage/san1>; rel="http://schemas.ogf.org/occi/kind#storage"; device=sda', uri=True))
+    [('/api/storage/san1', [('rel', 'http://schemas.ogf.org/occi/kind#storage'), ('device', 'sda')])]
+    >>> list(iter_web_headers('compute; scheme'))
+    Traceback (most recent call last):
+    HttpHeaderError: 'compute; scheme': failed to parse header attribute 'scheme'
+    """
+    header = None
+    for name, quoted, value, uri_value, token, comma, invalid in _web_header_tokens(s):
+        if name:
+            if header is None:
+                raise HttpHeaderError('%r: header value expected' % s)
+            value = quoted or value
+            if '\\' in value:
+                value = _unescape(r'\1', value)
+            header[1].append((name, value))
+        elif comma:
+            if header is not None:
+                yield header
+                header = None
+        elif header is None and (uri_value if uri else token):
+            header = (uri_value or token, [])
+        elif header is not None and (token or uri_value):
+            raise HttpHeaderError('%r: failed to parse header attribute %r' % (
+                s, token or uri_value))
         else:
-            value_str = '"%s"' % escape_quotes(str(v))
-        return '%s=%s' % (k, value_str)
+            raise HttpHeaderError('%r: invalid header' % s)
+    if header is not None:
+        yield header
 
 class HttpWebHeadersBase(HttpHeadersBase):
     """Base class for headers like Web Link/Category which have multiple
-    key-value attributes separated by semicolon.
+    key-value attributes separated by semicolon. See `iter_web_headers()`.
     """
-    HEADER_VALUE_REGEXP = re.compile(r'^\s*([^;]+)\s*')
+    URI_VALUE = False
 
     def add(self, item, attributes=()):
         super(HttpWebHeadersBase, self).add((item, attributes))
 
-    def _from_string(self, header_string, value_re=HEADER_VALUE_REGEXP):
-        # Match header value and remove from string
-        m = value_re.match(header_string)
-        if not m:
+    def parse(self, header_value):
+        self._headers = list(iter_web_headers(header_value, uri=self.URI_VALUE))
+        return self._headers
+
+    def _from_string(self, header_string):
+        headers = list(iter_web_headers(header_string, uri=self.URI_VALUE))
+        if len(headers) != 1:
             raise HttpHeaderError('%s: invalid header' % header_string)
-        value = m.groups()[0]
-        attr_string = header_string[m.end():]
-
-        # Split and parse string of header attributes
-        attributes = []
-        for s in split_quoted(attr_string, delimiter=';'):
-            if not s:
-                continue
-            try:
-                k, v = split_quoted(s.strip(), delimiter='=', remove_quotes=True)
-            except ValueError:
-                raise HttpHeaderError("'%s': failed to parse header attribute" % s)
-            attributes.append((k, v))
-
-        return (value, attributes)
+        return headers[0]
 
     def _to_string(self, header):
         item, attributes = header
-        return '; '.join(
-            ['%s' % item] +
-            ['%s="%s"' % (name, escape_quotes(str(value))) for name, value in attributes])
+        fragment = _web_fragment
+        return '; '.join(['%s' % item] +
+                [fragment(name, value) for name, value in attributes])
 
 class HttpLinkHeaders(HttpWebHeadersBase):
     """HTTP Web Link header.
@@ -155,10 +242,7 @@ class HttpLinkHeaders(HttpWebHeadersBase):
     True
 
     """
-    HEADER_VALUE_REGEXP = re.compile(r'^\s*<([^>]+)>\s*')
-
-    def _from_string(self, s):
-        return super(HttpLinkHeaders, self)._from_string(s, value_re=self.HEADER_VALUE_REGEXP)
+    URI_VALUE = True
 
     def _to_string(self, header):
         uri, attributes = header
@@ -195,6 +279,11 @@ class HttpAcceptHeaders(HttpWebHeadersBase):
     >>> t = h.parse(s)
     >>> [t for t, params in h.all_sorted()]
     ['text/html', 'text/plain', 'text/*', '*/*']
+    >>> t = h.parse('text/plain;q=0, text/occi;q=0.5, */*;q=0.1')
+    >>> h.accept_types()
+    ['text/occi', '*/*']
+    >>> h.refused_types()
+    ['text/plain']
 
 
     """
@@ -211,13 +300,46 @@ class HttpAcceptHeaders(HttpWebHeadersBase):
                 if name == 'q':
                     pref = float(value)
                     break
-        except IndexError, ValueError:
+        except (IndexError, ValueError):
             pass
         return pref
 
     def all_sorted(self):
         return sorted(self.all(), key=self.q, reverse=True)
 
+    def accept_types(self):
+        """Return the accepted media types in order of preference, excluding
+        media types explicitly refused using ``q=0``.
+        """
+        return [accept_type for accept_type, params in self.all_sorted()
+                if self.q((accept_type, params)) != 0]
+
+    def refused_types(self):
+        """Return the media types and ranges explicitly refused using ``q=0``.
+        """
+        return [accept_type for accept_type, params in self.all()
+                if self.q((accept_type, params)) == 0]
+
+ACCEPT_CACHE_SIZE = 256
+_accept_cache = LRUCache(ACCEPT_CACHE_SIZE)
+
+def parse_accept(header_value):
+    """Return the accepted media types of an Accept header value as a tuple
+    in order of preference. The result is memoized by the raw header value.
+
+    >>> parse_accept('text/*, text/occi, */*;q=0.1')
+    ('text/occi', '*/*', 'text/*')
+    >>> parse_accept('text/*, text/occi, */*;q=0.1') is parse_accept('text/*, text/occi, */*;q=0.1')
+    True
+    """
+    accept_types = _accept_cache.get(header_value)
+    if accept_types is None:
+        h = HttpAcceptHeaders()
+        h.parse(header_value)
+        accept_types = tuple(h.accept_types())
+        _accept_cache.put(header_value, accept_types)
+    return accept_types
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -18,27 +18,47 @@
 #
 
 import re
+import weakref
 
 from occi.core import Category, Kind, Mixin, Attribute
 from occi.http.header import (HttpHeaderError, HttpHeadersBase,
         HttpWebHeadersBase, HttpCategoryHeaders, HttpLinkHeaders,
-        HttpAttributeHeaders, HttpAcceptHeaders)
+        HttpAttributeHeaders, parse_accept)
 from occi.http.dataobject import DataObject, LinkRepr, URLTranslator
+from occi.http.utils import LRUCache
 
 _parsers = {}
 
+# Parser classes negotiated by raw Content-Type header value
+NEGOTIATION_CACHE_SIZE = 256
+_negotiated = LRUCache(NEGOTIATION_CACHE_SIZE)
+
+# Registered categories resolved from raw Category header values, one cache
+# per CategoryRegistry keyed by registry generation and header value
+CATEGORY_CACHE_SIZE = 1000
+_category_caches = weakref.WeakKeyDictionary()
+
+# Attribute specifications of a Category header, e.g. "occi.core.id{immutable}"
+_attribute_spec_plain = re.compile(r'^([a-z0-9._-]+)$')
+_attribute_spec_props = re.compile(r'^([a-z0-9._-]+){(.*)}$')
+
 class ParserError(Exception):
     pass
 
 def register_parser(content_type, parser):
     _parsers[content_type] = parser
+    _negotiated.clear()
 
 def unregister_parser(content_type):
     del _parsers[content_type]
+    _negotiated.clear()
 
-def get_parser(content_type=None, translator=None):
+def get_parser(content_type=None, translator=None, category_registry=None):
     """Return a parser for the given Content-Type.
 
+    :keyword category_registry: If specified, categories found in the request
+        are resolved through the `CategoryRegistry`.
+
     >>> p = get_parser('text/occi')
     >>> isinstance(p, HeaderParser)
     True
@@ -52,8 +72,29 @@ def get_parser(content_type=None, translator=None):
     Traceback (most recent call last):
         File "parser.py", line 41, in parser
     ParserError: "application/not-supported": Content-Type not supported
+    >>> register_parser('application/occi+test', TextURIListParser)
+    >>> p = get_parser('application/occi+test')
+    >>> isinstance(p, TextURIListParser)
+    True
+    >>> unregister_parser('application/occi+test')
+    >>> p = get_parser('application/occi+test')
+    Traceback (most recent call last):
+        File "parser.py", line 41, in parser
+    ParserError: "application/occi+test": Content-Type not supported
+    >>> class LegacyParser(TextURIListParser):
+    ...     def __init__(self, translator=None):
+    ...         super(LegacyParser, self).__init__(translator=translator)
+    >>> register_parser('application/occi+test', LegacyParser)
+    >>> from occi.core import CategoryRegistry
+    >>> p = get_parser('application/occi+test', category_registry=CategoryRegistry())
+    >>> isinstance(p, LegacyParser)
+    True
+    >>> unregister_parser('application/occi+test')
     """
-    p = None
+    p = _negotiated.get(content_type)
+    if p:
+        return _create_parser(p, translator, category_registry)
+
     if not content_type:
         p = _parsers.get(None)
     else:
@@ -69,7 +110,18 @@ def get_parser(content_type=None, translator=None):
 
     if not p:
         raise ParserError('"%s": Content-Type not supported' % content_type)
-    return p(translator=translator)
+    _negotiated.put(content_type, p)
+    return _create_parser(p, translator, category_registry)
+
+def _create_parser(parser, translator, category_registry):
+    # Parsers registered before category_registry was introduced only take a
+    # translator
+    if category_registry is None:
+        return parser(translator=translator)
+    try:
+        return parser(translator=translator, category_registry=category_registry)
+    except TypeError:
+        return parser(translator=translator)
 
 class Parser(object):
     """Parser base class.
@@ -80,14 +132,20 @@ class Parser(object):
     The result of the parse() method is stored in the following attributes:
     :var objects: A list of `DataObject` instances
     :var accept_types: A list of content types (populated by Parser.parse())
+    :var accept_header: The raw value of the Accept header(s), if any
+
+    If a `CategoryRegistry` is specified, parsed categories which are all
+    registered are replaced by the registered instances.
 
     """
     OCCI_SPECIFICATION = ('vendor', 'name', 'version')
 
-    def __init__(self, translator=None):
+    def __init__(self, translator=None, category_registry=None):
         self.objects = []
         self.accept_types = []
+        self.accept_header = None
         self.translator = translator or URLTranslator('')
+        self.category_registry = category_registry
 
     def specification(self):
         return '-'.join(self.OCCI_SPECIFICATION)
@@ -109,10 +167,11 @@ class Parser(object):
         """Parse Accept header and store the accepted content types in
         :var accept_types:
         """
-        h = HttpAcceptHeaders()
-        h.parse(header_value)
-        for c_type, c_params in h.all_sorted():
-            self.accept_types.append(c_type)
+        self.accept_types.extend(parse_accept(header_value))
+        if self.accept_header is None:
+            self.accept_header = header_value
+        else:
+            self.accept_header += ', ' + header_value
 
 class HeaderParser(Parser):
     """Parser for the text/occi content type.
@@ -136,6 +195,25 @@ class HeaderParser(Parser):
 
     >>> p.objects[0].location
 
+    >>> from occi.core import CategoryRegistry
+    >>> from occi.ext.infrastructure import ComputeKind, IPNetworkInterfaceMixin
+    >>> reg = CategoryRegistry()
+    >>> reg.register(ComputeKind)
+    >>> headers = [('Category', 'compute; scheme="http://schemas.ogf.org/occi/infrastructure#"; class="kind"')]
+    >>> p = HeaderParser(category_registry=reg)
+    >>> p.parse(headers=headers)
+    >>> p.objects[0].categories[0] is ComputeKind
+    True
+    >>> headers.append(('Category', 'ipnetworkinterface; scheme="http://schemas.ogf.org/occi/infrastructure#"'))
+    >>> p = HeaderParser(category_registry=reg)
+    >>> p.parse(headers=headers)
+    >>> p.objects[0].categories[1] is IPNetworkInterfaceMixin
+    False
+    >>> reg.register(IPNetworkInterfaceMixin)
+    >>> p = HeaderParser(category_registry=reg)
+    >>> p.parse(headers=headers)
+    >>> p.objects[0].categories[1] is IPNetworkInterfaceMixin
+    True
     """
     OCCI_SPECIFICATION = ('occi', 'http', '1.1')
 
@@ -177,6 +255,34 @@ class HeaderParser(Parser):
             self.objects.append(DataObject(location=loc))
 
     def _parse_category_header(self, header_value):
+        """Parse a Category header value. If all categories are found in the
+        `CategoryRegistry`, the registered instances are returned instead.
+        """
+        registry = self.category_registry
+        if registry is None:
+            return self._build_categories(header_value)
+
+        cache = _category_caches.get(registry)
+        if cache is None:
+            cache = _category_caches.setdefault(registry,
+                    LRUCache(CATEGORY_CACHE_SIZE))
+        snapshot = registry.snapshot()
+        key = (snapshot.generation, header_value)
+        categories = cache.get(key)
+        if categories is None:
+            categories = self._build_categories(header_value)
+            try:
+                categories = tuple([snapshot.lookup_id(category)
+                    for category in categories])
+            except Category.DoesNotExist:
+                return categories
+            cache.put(key, categories)
+        return list(categories)
+
+    def _build_categories(self, header_value):
+        """Create new Category/Kind/Mixin instances from a Category header
+        value.
+        """
         categories = []
         category_headers = HttpCategoryHeaders()
         category_headers.parse(header_value)
@@ -207,19 +313,17 @@ class HeaderParser(Parser):
                 r_scheme, r_term = t.split('#', 1)
                 r_scheme += '#'
                 related = cls(r_term, r_scheme)
-            except KeyError, ValueError:
+            except (KeyError, ValueError):
                 related = None
 
             # Supported attributes (mutable)
             try:
                 attributes = []
-                SPEC_PLAIN = re.compile(r'^([a-z0-9._-]+)$')
-                SPEC_PROPS = re.compile(r'^([a-z0-9._-]+){(.*)}$')
                 for attr_spec in param['attributes'].split():
                     attr_kwargs = {}
-                    m = SPEC_PLAIN.match(attr_spec)
+                    m = _attribute_spec_plain.match(attr_spec)
                     if not m:
-                        m = SPEC_PROPS.match(attr_spec)
+                        m = _attribute_spec_props.match(attr_spec)
                         if not m:
                             raise HttpHeaderError('%s: Invalid attribute specification in Category header' % attr_spec)
                         else:
@@ -229,7 +333,7 @@ class HeaderParser(Parser):
                                 if prop == 'immutable':
                                     attr_kwargs['mutable'] = False
                     attributes.append(Attribute(m.groups()[0], **attr_kwargs))
-            except KeyError, IndexError:
+            except (KeyError, IndexError):
                 attributes = None
 
             # Supported actions
@@ -310,8 +414,9 @@ class TextPlainParser(Parser):
     """
     OCCI_SPECIFICATION = ('occi', 'http', '1.1')
 
-    def __init__(self, translator=None):
-        self._header_parser = HeaderParser(translator=translator)
+    def __init__(self, translator=None, category_registry=None):
+        self._header_parser = HeaderParser(translator=translator,
+                category_registry=category_registry)
 
     def get_objects(self):
         return self._header_parser.objects
@@ -321,6 +426,12 @@ class TextPlainParser(Parser):
         return self._header_parser.accept_types
     accept_types = property(get_accept_types)
 
+    def get_accept_header(self):
+        return self._header_parser.accept_header
+    def set_accept_header(self, value):
+        self._header_parser.accept_header = value
+    accept_header = property(get_accept_header, set_accept_header)
+
     def parse(self, headers=None, body=None):
         super(TextPlainParser, self).parse(headers, body)
         body = body or ''
@@ -19,11 +19,17 @@
 
 import re
 
+from occi import OrderedDict
 from occi.core import Category, Kind, Mixin
-from occi.http.header import HttpHeaderError, HttpHeadersBase, HttpWebHeadersBase, HttpCategoryHeaders, HttpLinkHeaders, HttpAttributeHeaders
+from occi.http.header import HttpHeaderError, HttpHeadersBase, HttpWebHeadersBase, HttpCategoryHeaders, HttpLinkHeaders, HttpAttributeHeaders, HttpAcceptHeaders
 from occi.http.dataobject import DataObject, LinkRepr
+from occi.http.utils import LRUCache
 
-_renderers= {}
+_renderers = OrderedDict()
+
+# Renderer classes negotiated by raw Accept header value
+NEGOTIATION_CACHE_SIZE = 256
+_negotiated = LRUCache(NEGOTIATION_CACHE_SIZE)
 
 class RendererError(Exception):
     pass
@@ -35,15 +41,20 @@ def register_renderer(renderer, pattern=None, media_type=None, default=False):
         media_type = media_type or renderer.MEDIA_TYPE
         pattern = pattern or media_type
     _renderers[pattern] = (renderer, media_type)
+    _negotiated.clear()
 
 def unregister_renderer(pattern):
     del _renderers[pattern]
+    _negotiated.clear()
 
-def get_renderer(accept_types=None):
+def get_renderer(accept_types=None, accept_header=None):
     """Return a renderer matching the list of accepted content-types.
 
     :keyword accept_types: List of acceptable content types, i.e. the result of
         _parsing_ an Accept header.
+    :keyword accept_header: The raw Accept header value. If specified,
+        `accept_types` is ignored and the negotiated renderer is memoized by
+        the header value.
 
     >>> p = get_renderer(['text/occi'])
     >>> isinstance(p, HeaderRenderer)
@@ -64,23 +75,89 @@ def get_renderer(accept_types=None):
     Traceback (most recent call last):
         File "renderer.py", line 41, in renderer
     RendererError: No renderer found for requested media types
+    >>> p = get_renderer(accept_header='text/plain;q=0, text/occi;q=0.5')
+    >>> isinstance(p, HeaderRenderer)
+    True
+    >>> get_renderer(accept_header='text/occi;q=0, */*').media_type
+    'text/plain'
+    >>> get_renderer(accept_header='text/plain;q=0, */*').media_type
+    'text/occi'
+    >>> get_renderer(accept_header='text/plain;q=0, text/*').media_type
+    'text/occi'
+    >>> get_renderer(accept_header='text/*;q=0, text/plain').media_type
+    'text/plain'
+    >>> get_renderer(accept_header='text/plain;q=0')
+    Traceback (most recent call last):
+        File "renderer.py", line 41, in renderer
+    RendererError: No renderer found for requested media types
+    >>> get_renderer(accept_header='*/*;q=0')
+    Traceback (most recent call last):
+        File "renderer.py", line 41, in renderer
+    RendererError: No renderer found for requested media types
+    >>> get_renderer(accept_header='text/plain;q=0, text/uri-list;q=0, text/occi;q=0, */*;q=0.1')
+    Traceback (most recent call last):
+        File "renderer.py", line 41, in renderer
+    RendererError: No renderer found for requested media types
+    >>> register_renderer(TextURIListRenderer, pattern='application/*')
+    >>> p = get_renderer(accept_header='application/*')
+    >>> isinstance(p, TextURIListRenderer)
+    True
+    >>> unregister_renderer('application/*')
+    >>> p = get_renderer(accept_header='application/*')
+    Traceback (most recent call last):
+        File "renderer.py", line 41, in renderer
+    RendererError: No renderer found for requested media types
     """
-    renderer = None
-    if not accept_types:
-        renderer, media_type = _renderers.get(None)
+    if accept_header is None:
+        if not accept_types:
+            result = _renderers.get(None)
+        else:
+            result = _negotiate(accept_types)
     else:
-        for pattern in accept_types:
-            try:
-                renderer, media_type = _renderers[pattern]
-            except KeyError:
-                pass
-            else:
-                break
-
-    if not renderer:
+        result = _negotiated.get(accept_header)
+        if result is None:
+            h = HttpAcceptHeaders()
+            h.parse(accept_header)
+            result = _negotiate(h.accept_types(), h.refused_types())
+            if result:
+                _negotiated.put(accept_header, result)
+
+    if not result:
         raise RendererError('No renderer found for requested media types')
+    renderer, media_type = result
     return renderer(media_type=media_type)
 
+def _negotiate(accept_types, refused_types=()):
+    """Return the ``(renderer, media_type)`` registered for the most preferred
+    of the accepted media types. A ``type/*`` range matches the renderer
+    registered for the range, then the renderers registered for that type. A
+    ``*/*`` range matches the renderer registered for it, then the default
+    renderer and then any other renderer. Renderers for media types refused
+    with ``q=0`` are skipped.
+    """
+    def refused(media_type):
+        return (media_type in refused_types or
+                media_type.split('/', 1)[0] + '/*' in refused_types)
+
+    for pattern in accept_types:
+        result = _renderers.get(pattern)
+        if not pattern.endswith('/*'):
+            if result:
+                return result
+            continue
+
+        candidates = [result]
+        if pattern == '*/*':
+            candidates.append(_renderers.get(None))
+            candidates.extend(_renderers.itervalues())
+        else:
+            candidates.extend([r for p, r in _renderers.iteritems()
+                    if p and p.startswith(pattern[:-1])])
+        for result in candidates:
+            if result and not refused(result[1] or result[0].MEDIA_TYPE):
+                return result
+    return None
+
 class Renderer(object):
     """Renderer base class.
 
@@ -154,7 +231,7 @@ class HeaderRenderer(Renderer):
 
             if 'category_discovery' in obj.render_flags:
                 if category.related:
-                    params.append(('rel',  category.related))
+                    params.append(('rel',  category.related.id))
                 if category.attributes:
                     attr_defs=[]
                     for attr in category.unique_attributes.itervalues():
@@ -169,7 +246,7 @@ class HeaderRenderer(Renderer):
                         attr_defs.append(attr_def)
                     params.append(('attributes', ' '.join(attr_defs)))
                 if hasattr(category, 'actions') and category.actions:
-                    params.append(('actions', ' '.join([str(cat) for cat in category.actions])))
+                    params.append(('actions', ' '.join([cat.id for cat in category.actions])))
                 if hasattr(category, 'location') and category.location:
                     params.append(('location',
                         obj.translator.url_build(category.location, path_only=True)))
@@ -188,12 +265,12 @@ class HeaderRenderer(Renderer):
         link_headers = HttpLinkHeaders()
         for link in obj.links + obj.actions:
             params = []
-            params.append(('rel',  ' '.join([str(cat) for cat in link.target_categories])))
+            params.append(('rel',  ' '.join([cat.id for cat in link.target_categories])))
             params.append(('title',  link.target_title or ''))
             if link.link_location:
                 params.append(('self',  link.link_location))
                 if link.link_categories and link.link_attributes:
-                    params.append(('category', ' '.join([str(cat) for cat in link.link_categories])))
+                    params.append(('category', ' '.join([cat.id for cat in link.link_categories])))
                     for attr, value in link.link_attributes:
                         params.append((attr,  value))
 
@@ -240,8 +317,8 @@ class TextPlainRenderer(HeaderRenderer):
 
     def render(self, objects):
         super(TextPlainRenderer, self).render(objects)
-        for name, value in self.headers[1:]:
-            self.body += '%s: %s\r\n' % (name, value)
+        self.body += ''.join(['%s: %s\r\n' % (name, value)
+            for name, value in self.headers[1:]])
         self.headers = []
         self.headers.append(('Content-Type', '%s; charset=utf-8' % self.media_type))
 
@@ -274,9 +351,8 @@ class TextURIListRenderer(Renderer):
         self.headers.append(('Content-Type', '%s; charset=utf-8' % self.media_type))
         if not isinstance(objects, list) and not isinstance(objects, tuple):
             objects = [objects]
-        for obj in objects:
-            if obj.location:
-                self.body += '%s\r\n' % obj.location
+        self.body += ''.join(['%s\r\n' % obj.location
+            for obj in objects if obj.location])
 
 class TextRenderer(Renderer):
     """The default renderer. Uses text/plain for single object rendering and
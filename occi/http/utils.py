@@ -17,63 +17,120 @@
 # along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import re
+
+from occi import LRUCache
+
 def escape_quotes(s, quotechar='"', escapechar='\\'):
     """Escape quote character and also escape the escape character itself.
+    Strings without any quote or escape character are returned as is.
 
     >>> escape_quotes('This is a "little" VM')
     'This is a \\\\"little\\\\" VM'
+    >>> s = 'Nothing to escape'
+    >>> escape_quotes(s) is s
+    True
+    """
+    if escapechar in s:
+        s = s.replace(escapechar, escapechar + escapechar)
+    if quotechar in s and quotechar != escapechar:
+        s = s.replace(quotechar, escapechar + quotechar)
+    return s
+
+class _Splitter(object):
+    """Compiled split_quoted() implementation for a set of delimiter, quote
+    and escape characters.
+
+    Only single characters have a special meaning. The escape character
+    takes precedence over the quote character, which takes precedence over
+    the delimiter.
     """
-    buf = ''
-    for c in s:
-        if c == quotechar or c == escapechar:
-            buf += escapechar
-        buf += c
-    return buf
+    def __init__(self, delimiter, quotechar, escapechar):
+        if len(escapechar) != 1: escapechar = None
+        if len(quotechar) != 1 or quotechar == escapechar: quotechar = None
+        if len(delimiter) != 1 or delimiter in (quotechar, escapechar): delimiter = None
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.escapechar = escapechar
+
+        # An item is a sequence of ordinary characters, escaped characters
+        # and quoted sections, optionally followed by the delimiter
+        D, Q, E = [c and re.escape(c) for c in (delimiter, quotechar, escapechar)]
+        specials = ''.join([c for c in (D, Q, E) if c])
+        units = [specials and '[^%s]+' % specials or r'[\s\S]+']
+        if E:
+            units.append(r'%s[\s\S]?' % E)
+        if Q:
+            quoted = ['[^%s]+' % ''.join([c for c in (Q, E) if c])]
+            if E:
+                quoted.append(r'%s[\s\S]?' % E)
+            units.append('%s(?:%s)*%s?' % (Q, '|'.join(quoted), Q))
+        item = '(?:%s)*' % '|'.join(units)
+        self.findall = re.compile('(%s)(%s)?' % (item, D or '(?!)')).findall
+
+        # Splits an item at quotes and escape characters, keeping the
+        # escaped characters
+        self.unescape = None
+        if E:
+            self.unescape = re.compile('|'.join(
+                [r'%s([\s\S]?)' % E] + (Q and [Q] or []))).split
+
+    def split(self, s, remove_quotes=False):
+        delimiter = self.delimiter
+        quotechar = self.quotechar
+        escapechar = self.escapechar
+
+        # Nothing but delimiters, split at C level
+        if (escapechar is None or escapechar not in s) and \
+                (quotechar is None or quotechar not in s):
+            if delimiter is None:
+                return s and [s] or []
+            l = [item or None for item in s.split(delimiter)]
+            if l[-1] is None:
+                l.pop()
+            return l
+
+        l = []
+        for item, sep in self.findall(s):
+            if not item:
+                if sep:
+                    l.append(None)
+                continue
+            if remove_quotes:
+                if escapechar is not None and escapechar in item:
+                    item = ''.join(filter(None, self.unescape(item)))
+                elif quotechar is not None:
+                    item = item.replace(quotechar, '')
+            l.append(item)
+        return l
+
+# Compiled split_quoted() implementations keyed by the special characters
+_splitters = {}
 
 def split_quoted(s, delimiter=',', quotechar='"', escapechar='\\', remove_quotes=False):
     """Split string on delimiter if and only if delimiter is not within a quote
     nor escaped by the escape character. An escaped quote character will not
     affect the quote state during parsing.
 
+    The string is split by a compiled regular expression matching whole
+    items, i.e. without any per-character work in Python. An empty item
+    between two delimiters is returned as None.
+
     >>> split_quoted(r'name="foo,bar",size=40, key="value",')
     ['name="foo,bar"', 'size=40', ' key="value"']
     >>> split_quoted(r'name="foo,bar",size=40, key="value",', remove_quotes=True)
     ['name=foo,bar', 'size=40', ' key=value']
     >>> split_quoted(r'name="foo,bar\\",size=40, key=", value=bar\\,foo, items=3', remove_quotes=True)
     ['name=foo,bar",size=40, key=', ' value=bar,foo', ' items=3']
+    >>> split_quoted('a,,b')
+    ['a', None, 'b']
     """
-    l = []
-    quote = False
-    escape = False
-    buf = None
-    for c in s:
-        #print "e=%s q=%s\t%s" % (escape, quote, buf)
-        if c == escapechar:
-            escape = not escape
-            if escape and remove_quotes:
-                if buf is None:
-                    buf = ''
-                continue
-        elif c == quotechar and not escape:
-            quote = not quote
-            if remove_quotes:
-                if buf is None:
-                    buf = ''
-                continue
-        elif c == delimiter and not escape and not quote:
-            l.append(buf)
-            buf = None
-            continue
-        elif escape:
-            escape = False
-
-        if buf is None:
-            buf = ''
-        buf += c
-    if buf is not None:
-        l.append(buf)
-    return l
-
+    key = (delimiter, quotechar, escapechar)
+    try:
+        splitter = _splitters[key]
+    except KeyError:
+        splitter = _splitters[key] = _Splitter(*key)
+    return splitter.split(s, remove_quotes)
 
 if __name__ == "__main__":
     import doctest
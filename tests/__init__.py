@@ -22,9 +22,11 @@ from utils import unittest
 import doctest
 
 DOCTEST_MODULES = [
+        'occi',
         'occi.core',
         'occi.backend',
         'occi.backend.dummy',
+        'occi.codec',
         'occi.http.dataobject',
         'occi.http.handler',
         'occi.http.header',
@@ -36,6 +38,8 @@ DOCTEST_MODULES = [
 
 TEST_MODULES = [
         'tests.test_http_handler',
+        'tests.test_http_header',
+        'tests.test_http_utils',
 ]
 
 def all():
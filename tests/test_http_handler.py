@@ -20,6 +20,7 @@
 import uuid
 from utils import unittest
 
+from occi.backend import ServerBackend
 from occi.backend.dummy import DummyBackend
 from occi.http.handler import (HttpRequest, HttpResponse, DiscoveryHandler,
         EntityHandler, CollectionHandler)
@@ -27,8 +28,14 @@ from occi.http.dataobject import URLTranslator
 from occi.ext.infrastructure import *
 
 
+class DefaultMethodsBackend(DummyBackend):
+    """DummyBackend using the default ServerBackend methods."""
+    filter_links = ServerBackend.filter_links.im_func
+    update_entities = ServerBackend.update_entities.im_func
+
 class HandlerTestCaseBase(unittest.TestCase):
     BASE_URL = '/api'
+    BACKEND = DummyBackend
 
     CustomMixin = Mixin('credentials', 'http://example.com/occi/user#',
             title='User credentials',
@@ -41,7 +48,7 @@ class HandlerTestCaseBase(unittest.TestCase):
 
     def setUp(self):
         # OCCI Server Backend
-        backend = DummyBackend()
+        backend = self.BACKEND()
         self.backend = backend
 
         # URL Translator
@@ -299,6 +306,24 @@ class EntityHandlerTestCase(HandlerTestCaseBase):
         expected_body.append('X-OCCI-Attribute: occi.compute.state="active"')
         self._verify_body(get_response.body, expected_body)
 
+    def test_post_update_link_target(self):
+        link = self.links[1]
+        storage = StorageKind.entity_type(StorageKind)
+        storage = self.backend.save_entities([storage])[0]
+        request_headers = [('accept', 'text/uri-list')]
+        request_headers.append(('x-occi-attribute', 'occi.core.target="%s"' % self._loc(storage)))
+        request = HttpRequest(request_headers, '')
+        response = self.handler.post(request, str(link.id))
+        self.assertEqual(response.status, 200)
+        self.assertEqual([l.id for l in self.backend.filter_links(target=storage.id)], [link.id])
+        self.assertEqual(self.backend.filter_links(target=self.storages[0].id), [])
+
+        request_headers = [('x-occi-attribute', 'occi.core.target="%s/storage/%s"' % (self.BASE_URL, uuid.uuid4()))]
+        request = HttpRequest(request_headers, '')
+        response = self.handler.post(request, str(link.id))
+        self.assertEqual(response.status, 404)
+        self.assertEqual([l.id for l in self.backend.filter_links(target=storage.id)], [link.id])
+
     def test_post_update_nonexisting(self):
         request = HttpRequest([], '')
         response = self.handler.post(request, 'blah/not/found')
@@ -360,6 +385,9 @@ class EntityHandlerTestCase(HandlerTestCaseBase):
         self.assertEqual(response.status, 404)
 
 
+class DefaultBackendEntityHandlerTestCase(EntityHandlerTestCase):
+    BACKEND = DefaultMethodsBackend
+
 class CollectionHandlerTestCase(HandlerTestCaseBase):
     def setUp(self):
         super(CollectionHandlerTestCase, self).setUp()
@@ -442,6 +470,30 @@ class CollectionHandlerTestCase(HandlerTestCaseBase):
         expected_body.append('X-OCCI-Location: %s' % self._loc(self.computes[1]))
         self._verify_body(response.body, expected_body)
 
+    def test_get_filter_link_target(self):
+        response = self._get(path=StorageLinkKind.location, headers=[('accept', 'text/plain')],
+                query_args={'target': [self._loc(self.storages[0])]})
+        expected_body = []
+        expected_body.append('X-OCCI-Location: %s' % self._loc(self.links[1]))
+        self._verify_body(response.body, expected_body)
+
+    def test_get_filter_link_target_attr(self):
+        target = self._loc(self.storages[0])
+        for deviceid, expected in (('ide:0:0', [self.links[1]]), ('ide:0:1', [])):
+            request_headers = [('accept', 'text/plain')]
+            request_headers.append(('Category', 'storagelink; scheme=http://schemas.ogf.org/occi/infrastructure#'))
+            request_headers.append(('x-occi-attribute', 'occi.storagelink.deviceid="%s"' % deviceid))
+            response = self._get(path=StorageLinkKind.location, headers=request_headers,
+                    query_args={'target': [target]})
+            expected_body = []
+            for link in expected:
+                expected_body.append('X-OCCI-Location: %s' % self._loc(link))
+            self._verify_body(response.body, expected_body)
+
+    def test_get_filter_link_target_invalid(self):
+        response = self._get(query_args={'target': ['/storage/foo']})
+        self.assertEqual(response.status, 400)
+
     def test_post_resource(self):
         request_headers = [('accept', 'text/plain')]
         request_headers.append(('Category', 'compute; scheme=http://schemas.ogf.org/occi/infrastructure#'))
@@ -478,6 +530,13 @@ class CollectionHandlerTestCase(HandlerTestCaseBase):
         self.assertEqual(response.body, '"occi.storage.size": Required attribute')
         self.assertEqual(response.status, 400)
 
+    def test_post_resource_invalid_attr(self):
+        request_headers = [('Category', 'compute; scheme=http://schemas.ogf.org/occi/infrastructure#')]
+        request_headers.append(('x-occi-attribute', 'occi.compute.speed="fast"'))
+        response = self._post(path=ComputeKind.location, headers=request_headers, content_type='text/occi')
+        self.assertEqual(response.body, "occi.compute.speed='fast': invalid attribute value")
+        self.assertEqual(response.status, 400)
+
     def test_post_link(self):
         source = self.test_post_resource()
         target = self._loc(self.storages[0])
@@ -583,6 +642,17 @@ class CollectionHandlerTestCase(HandlerTestCaseBase):
         entity = self.backend.get_entity(self.networks[0].id)
         self.assertEqual(len(entity.occi_list_categories()), 1)
 
+class DefaultBackendCollectionHandlerTestCase(CollectionHandlerTestCase):
+    BACKEND = DefaultMethodsBackend
+
+    def test_filter_links_without_target(self):
+        # Links stored by other backends may lack a source or target
+        link = StorageLinkKind.entity_type(StorageLinkKind)
+        link.occi_import_attributes([('occi.core.source', self.computes[1].id)], validate=False)
+        self.backend._db[link.id] = link
+        links = self.backend.filter_links(target=self.storages[0].id)
+        self.assertEqual([l.id for l in links], [self.links[1].id])
+
 class DiscoveryHandlerTestCase(HandlerTestCaseBase):
     def setUp(self):
         super(DiscoveryHandlerTestCase, self).setUp()
@@ -607,6 +677,12 @@ class DiscoveryHandlerTestCase(HandlerTestCaseBase):
 
         self._verify_headers(response.headers[1:5], expected_headers)
 
+    def test_get_not_acceptable(self):
+        request_headers = [('Accept', 'text/plain;q=0, */*;q=0')]
+        request = HttpRequest(request_headers, '')
+        response = self.handler.get(request)
+        self.assertEqual(response.status, 406)
+
     def test_get_filter(self):
         request_headers = [('Accept', 'text/plain')]
         request_headers.append(('Content-Type', 'text/occi'))
@@ -0,0 +1,62 @@
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from utils import RandomizedTestCase
+
+from occi.http.header import HttpCategoryHeaders, HttpLinkHeaders, HttpHeaderError
+
+
+class WebHeadersTestCase(RandomizedTestCase):
+    ALPHABET = 'ab =;,<>"\\\'#/:'
+
+    def random_headers(self, value_alphabet):
+        headers = []
+        for i in xrange(self.random.randint(1, 4)):
+            value = self.random_string(value_alphabet, minimum=1)
+            attributes = [(self.random_string('abc.-_', minimum=1), self.random_string())
+                    for j in xrange(self.random.randint(0, 4))]
+            headers.append((value, attributes))
+        return headers
+
+    def assertRoundTrip(self, cls, value_alphabet):
+        for i in xrange(self.ITERATIONS):
+            h = cls()
+            headers = self.random_headers(value_alphabet)
+            for value, attributes in headers:
+                h.add(value, attributes)
+            s = str(h)
+            self.assertEqual(cls().parse(s), headers, s)
+
+    def test_category_round_trip(self):
+        self.assertRoundTrip(HttpCategoryHeaders, 'abc-_.')
+
+    def test_link_round_trip(self):
+        self.assertRoundTrip(HttpLinkHeaders, 'abc/:?=;,#')
+
+    def test_whitespace(self):
+        self.assertEqual(HttpCategoryHeaders().parse(
+            ' compute ;scheme = "http://example.com/occi#" ;  ; title=Foo Bar ,storage'),
+            [('compute', [('scheme', 'http://example.com/occi#'), ('title', 'Foo Bar')]),
+             ('storage', [])])
+
+    def test_invalid(self):
+        for s in ('scheme="foo"', 'compute; scheme', 'compute storage',
+                'compute; "scheme"="foo"', '<compute>'):
+            self.assertRaises(HttpHeaderError, HttpCategoryHeaders().parse, s)
+        self.assertRaises(HttpHeaderError, HttpLinkHeaders().parse, 'compute')
@@ -0,0 +1,101 @@
+#
+# Copyright (C) 2010-2011  Ralf Nyren <ralf@nyren.net>
+#
+# This file is part of the occi-py library.
+#
+# The occi-py library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The occi-py library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from utils import RandomizedTestCase
+
+from occi.http.utils import split_quoted
+
+
+def split_quoted_reference(s, delimiter=',', quotechar='"', escapechar='\\', remove_quotes=False):
+    """Character by character reference implementation of split_quoted."""
+    l = []
+    quote = False
+    escape = False
+    buf = None
+    for c in s:
+        if c == escapechar:
+            escape = not escape
+            if escape and remove_quotes:
+                if buf is None:
+                    buf = ''
+                continue
+        elif c == quotechar and not escape:
+            quote = not quote
+            if remove_quotes:
+                if buf is None:
+                    buf = ''
+                continue
+        elif c == delimiter and not escape and not quote:
+            l.append(buf)
+            buf = None
+            continue
+        elif escape:
+            escape = False
+
+        if buf is None:
+            buf = ''
+        buf += c
+    if buf is not None:
+        l.append(buf)
+    return l
+
+
+class SplitQuotedTestCase(RandomizedTestCase):
+    ITERATIONS = 5000
+    MAX_LENGTH = 24
+
+    def assertEquivalent(self, s, **kwargs):
+        self.assertEqual(split_quoted(s, **kwargs),
+                split_quoted_reference(s, **kwargs),
+                '%r %r' % (s, kwargs))
+
+    def test_default(self):
+        for i in xrange(self.ITERATIONS):
+            s = self.random_string()
+            self.assertEquivalent(s)
+            self.assertEquivalent(s, remove_quotes=True)
+
+    def test_delimiters(self):
+        for i in xrange(self.ITERATIONS):
+            s = self.random_string()
+            for delimiter in ';=, ':
+                self.assertEquivalent(s, delimiter=delimiter,
+                        remove_quotes=self.random.random() < 0.5)
+
+    def test_special_characters(self):
+        specials = ',;="\\\'ab'
+        for i in xrange(self.ITERATIONS):
+            s = self.random_string()
+            kwargs = dict(zip(('delimiter', 'quotechar', 'escapechar'),
+                [self.random.choice(specials) for j in xrange(3)]))
+            kwargs['remove_quotes'] = self.random.random() < 0.5
+            self.assertEquivalent(s, **kwargs)
+
+    def test_no_special_characters(self):
+        for i in xrange(self.ITERATIONS):
+            s = self.random_string('ab ,')
+            self.assertEquivalent(s)
+            self.assertEquivalent(s, delimiter='', quotechar='')
+            self.assertEquivalent(s, delimiter='ab', escapechar='')
+
+    def test_long_quoted_value(self):
+        value = 'x' * 100000
+        s = 'a="%s",b=\\"%s' % (value, value)
+        self.assertEquivalent(s)
+        self.assertEquivalent(s, remove_quotes=True)
@@ -17,7 +17,26 @@
 # along with the occi-py library.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import random
+
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
+
+class RandomizedTestCase(unittest.TestCase):
+    """Base class for tests comparing results on random input. The random
+    generator is seeded for each test, i.e. failures are reproducible.
+    """
+    ALPHABET = 'ab =;,"\\\''
+    ITERATIONS = 500
+    MAX_LENGTH = 16
+    SEED = 1234
+
+    def setUp(self):
+        self.random = random.Random(self.SEED)
+
+    def random_string(self, alphabet=None, minimum=0):
+        n = self.random.randint(minimum, self.MAX_LENGTH)
+        alphabet = alphabet or self.ALPHABET
+        return ''.join([self.random.choice(alphabet) for i in xrange(n)])